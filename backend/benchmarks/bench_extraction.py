@@ -0,0 +1,63 @@
+"""
+Compares batch (single page.evaluate) and per-element quote extraction.
+
+Usage (from backend/):
+    python -m benchmarks.bench_extraction --quotes 60 --runs 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from benchmarks.fixtures import render_topic_page
+from scraper.playwright_engine import _extract_batch, _extract_element
+from scraper.browser_pool import BrowserPool
+from scraper.utils import QUOTE_SELECTOR, build_quote
+
+
+async def extract_batch(page) -> list:
+    return [build_quote(r) for r in await _extract_batch(page)]
+
+
+async def extract_element(page) -> list:
+    elements = await page.query_selector_all(QUOTE_SELECTOR)
+    return [build_quote(await _extract_element(el, idx, 1)) for idx, el in enumerate(elements, start=1)]
+
+
+async def run(quotes: int, runs: int) -> dict:
+    pool = BrowserPool(max_contexts=1)
+    html = render_topic_page("benchmark", quotes_per_page=quotes)
+    results = {}
+    try:
+        async with pool.page() as page:
+            await page.set_content(html)
+            for name, extract in (("batch", extract_batch), ("element", extract_element)):
+                timings = []
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    extracted = await extract(page)
+                    timings.append((time.perf_counter() - started) * 1000)
+                results[name] = {
+                    "quotes": len([q for q in extracted if q]),
+                    "median_ms": round(statistics.median(timings), 2),
+                    "min_ms": round(min(timings), 2),
+                }
+    finally:
+        await pool.close()
+
+    results["speedup"] = round(results["element"]["median_ms"] / max(results["batch"]["median_ms"], 1e-6), 1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quotes", type=int, default=60, help="Quotes on the synthetic page")
+    parser.add_argument("--runs", type=int, default=5, help="Repetitions per extraction mode")
+    args = parser.parse_args()
+
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+    print(json.dumps(asyncio.run(run(args.quotes, args.runs)), indent=2))
@@ -0,0 +1,253 @@
+"""
+Offline benchmark of the scrape -> enrich -> persist path.
+
+Serves BrainyQuote-like pages and images from a local HTTP server, stubs
+the Supabase table and storage APIs in memory, then measures
+scrape_brainyquote_generator alone ("scraper") and the /api/scrape stream
+end to end ("api") at several concurrency levels.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline --concurrency 1 4 16 --output bench.json
+    python -m benchmarks.bench_pipeline --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def configure_environment(args, base_url: str, workdir: str):
+    """Must run before the application modules are imported (config reads the environment)."""
+    os.environ.update({
+        "BRAINYQUOTE_BASE_URL": base_url,
+        "SCRAPER_ENGINES": args.engines,
+        "SCRAPER_HOST_RATE": str(args.host_rate),
+        # No job worker processes: nothing to spawn for in-process scrapes
+        "JOB_WORKERS": "0",
+        "SCRAPER_HOST_CONCURRENCY": str(args.host_concurrency),
+        "TOPIC_CACHE_TTL": "0",
+        "TOPIC_CACHE_DIR": os.path.join(workdir, "topics"),
+        "IMAGE_CACHE_PATH": os.path.join(workdir, "images.sqlite3"),
+    })
+    # supabase_client refuses to import without credentials; nothing reaches it
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+
+def instrument_engines(page_latencies: list[float]):
+    """Wraps every engine's fetch_page to record per-page latency."""
+    from scraper.brainyquote_scraper import ENGINES
+
+    for engine in ENGINES.values():
+        fetch_page = engine.fetch_page
+
+        async def timed(url, page_number, _fetch_page=fetch_page):
+            started = time.perf_counter()
+            try:
+                return await _fetch_page(url, page_number)
+            finally:
+                page_latencies.append(time.perf_counter() - started)
+
+        engine.fetch_page = timed
+
+
+async def run_scraper_client(topic: str, started: float) -> dict:
+    from scraper.brainyquote_scraper import scrape_brainyquote_generator
+
+    quotes = 0
+    first_quote = None
+    async for event in scrape_brainyquote_generator(topic):
+        if "text" in event:
+            quotes += 1
+            if first_quote is None:
+                first_quote = time.perf_counter() - started
+        elif "error" in event:
+            raise RuntimeError(event["error"])
+    return {"quotes": quotes, "ttfq": first_quote}
+
+
+async def run_api_client(client, topic: str, started: float) -> dict:
+    quotes = 0
+    images = 0
+    first_quote = None
+    async with client.stream("GET", "/api/scrape", params={"topic": topic}) as response:
+        async for line in response.aiter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+            if "text" in event:
+                quotes += 1
+                if first_quote is None:
+                    first_quote = time.perf_counter() - started
+            elif "image_ready" in event:
+                images += 1
+            elif "error" in event:
+                raise RuntimeError(event["error"])
+    return {"quotes": quotes, "images": images, "ttfq": first_quote}
+
+
+async def run_level(mode: str, concurrency: int, client, page_latencies: list[float]) -> dict:
+    from scraper.browser_pool import browser_pool
+
+    page_latencies.clear()
+    started = time.perf_counter()
+    topics = [f"bench-{mode}-{concurrency}-{i}" for i in range(concurrency)]
+    if mode == "scraper":
+        results = await asyncio.gather(*(run_scraper_client(topic, started) for topic in topics))
+    else:
+        results = await asyncio.gather(*(run_api_client(client, topic, started) for topic in topics))
+    elapsed = time.perf_counter() - started
+
+    quotes = sum(r["quotes"] for r in results)
+    ttfq = [r["ttfq"] for r in results if r["ttfq"] is not None]
+    pool = browser_pool.metrics()
+    level = {
+        "concurrency": concurrency,
+        "quotes": quotes,
+        "elapsed_s": round(elapsed, 3),
+        "quotes_per_s": round(quotes / elapsed, 1) if elapsed else 0.0,
+        "ttfq_avg_ms": round(1000 * statistics.mean(ttfq), 1) if ttfq else None,
+        "page_p50_ms": round(1000 * percentile(page_latencies, 50), 1),
+        "page_p99_ms": round(1000 * percentile(page_latencies, 99), 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "browsers_open": pool["browsers_open"],
+        "browser_launches": pool["browser_launches"],
+    }
+    if mode == "api":
+        level["image_ready_events"] = sum(r["images"] for r in results)
+    return level
+
+
+async def run(args, server, store, storage) -> dict:
+    import httpx
+    import uvicorn
+
+    import main
+
+    # Stub Supabase: table upserts and storage uploads stay in memory
+    main.quote_writer.sink = store.upsert
+    main.topic_cache.producer.keywords["upload"] = storage.upload
+
+    page_latencies: list[float] = []
+    instrument_engines(page_latencies)
+
+    # A real uvicorn server: in-process ASGI transports buffer the whole response
+    api_server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=0, log_level="warning", loop="asyncio"))
+    serving = asyncio.create_task(api_server.serve())
+    while not api_server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.01)
+    port = api_server.servers[0].sockets[0].getsockname()[1]
+
+    report = {"engines": args.engines, "levels": {}}
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+            for mode in args.modes:
+                report["levels"][mode] = []
+                for concurrency in args.concurrency:
+                    level = await run_level(mode, concurrency, client, page_latencies)
+                    report["levels"][mode].append(level)
+                    print(f"[{mode}] {json.dumps(level)}", file=sys.stderr)
+    finally:
+        api_server.should_exit = True
+        await serving
+
+    report["server_requests"] = dict(server.requests)
+    report["storage"] = {"uploads": storage.uploads, "objects": len(storage.objects)}
+    report["database"] = {"upsert_requests": store.requests, "rows": len(store.rows)}
+    return report
+
+
+def compare(current: dict, baseline: dict):
+    """Prints current/baseline ratios for every numeric metric of matching levels."""
+    for mode, levels in current["levels"].items():
+        previous = {level["concurrency"]: level for level in baseline.get("levels", {}).get(mode, [])}
+        for level in levels:
+            before = previous.get(level["concurrency"])
+            if not before:
+                continue
+            ratios = {
+                key: round(value / before[key], 2)
+                for key, value in level.items()
+                if key != "concurrency" and isinstance(value, (int, float)) and before.get(key)
+            }
+            print(f"[{mode} x{level['concurrency']}] vs baseline: {json.dumps(ratios)}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--modes", nargs="+", choices=["scraper", "api"], default=["scraper", "api"])
+    parser.add_argument("--engines", default="http", help="SCRAPER_ENGINES value (e.g. http,playwright)")
+    parser.add_argument("--pages", type=int, default=5, help="Pages per topic")
+    parser.add_argument("--quotes-per-page", type=int, default=60)
+    parser.add_argument("--page-latency", type=float, default=0.05, help="Simulated server latency per page (s)")
+    parser.add_argument("--image-latency", type=float, default=0.01, help="Simulated latency per image (s)")
+    parser.add_argument("--storage-latency", type=float, default=0.03, help="Simulated storage upload latency (s)")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Simulated upsert latency (s)")
+    parser.add_argument("--host-rate", type=float, default=0, help="Per-host requests/s (0 = unlimited)")
+    parser.add_argument("--host-concurrency", type=int, default=8)
+    parser.add_argument("--fixtures-dir", help="Directory of recorded topic pages to serve")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    from benchmarks.server import FixtureServer
+    from benchmarks.stubs import MemoryQuoteStore, MemoryStorage
+
+    server = FixtureServer(
+        pages_per_topic=args.pages,
+        quotes_per_page=args.quotes_per_page,
+        page_latency=args.page_latency,
+        image_latency=args.image_latency,
+        fixtures_dir=args.fixtures_dir,
+    ).start()
+
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            configure_environment(args, server.base_url, workdir)
+            if sys.platform == "win32":
+                asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+            report = asyncio.run(run(args, server, MemoryQuoteStore(args.db_latency), MemoryStorage(args.storage_latency)))
+    finally:
+        server.stop()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,76 @@
+"""
+Compares the lean and full browser page profiles: bytes, requests and time per page.
+
+Loads topic pages with the Playwright engine once per profile, from the
+local fixture server by default or from another site with --base-url.
+
+Usage (from backend/):
+    python -m benchmarks.bench_profiles --pages 10
+    python -m benchmarks.bench_profiles --base-url https://www.brainyquote.com --topic love --pages 3
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.server import FixtureServer
+from scraper.browser_pool import BrowserPool
+from scraper.page_profile import FULL_PROFILE, lean_profile
+from scraper.playwright_engine import PlaywrightEngine
+
+
+async def run_profile(profile, base_url: str, topic: str, pages: int) -> dict:
+    pool = BrowserPool(max_contexts=1, profile=profile)
+    engine = PlaywrightEngine(pool)
+    quotes = 0
+    try:
+        # Launch outside the measured loop
+        await pool.start()
+        started = time.perf_counter()
+        for page_number in range(1, pages + 1):
+            url = f"{base_url}/topics/{topic}-quotes" + (f"_{page_number}" if page_number > 1 else "")
+            result = await engine.fetch_page(url, page_number)
+            quotes += len([r for r in result.records if r])
+        elapsed = time.perf_counter() - started
+    finally:
+        await pool.close()
+    return {"quotes": quotes, "elapsed_s": round(elapsed, 3), **pool.page_metrics()}
+
+
+async def run(base_url: str, topic: str, pages: int) -> dict:
+    host = urlsplit(base_url).hostname
+    profiles = {"full": FULL_PROFILE, "lean": lean_profile(allowed_hosts=[host])}
+    report = {name: await run_profile(profile, base_url, topic, pages) for name, profile in profiles.items()}
+
+    full, lean = report["full"], report["lean"]
+    report["saved_per_page"] = {
+        "kb": round(full["page_kb_avg"] - lean["page_kb_avg"], 1),
+        "requests": round(full["page_requests_avg"] - lean["page_requests_avg"], 1),
+        "ms": round(full["page_ms_avg"] - lean["page_ms_avg"], 1),
+    }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Site to load (default: local fixture server)")
+    parser.add_argument("--topic", default="benchmark")
+    parser.add_argument("--pages", type=int, default=10, help="Pages loaded per profile")
+    parser.add_argument("--page-latency", type=float, default=0.02, help="Fixture server latency per request (s)")
+    args = parser.parse_args()
+
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = FixtureServer(pages_per_topic=args.pages, page_latency=args.page_latency, image_latency=args.page_latency).start()
+        base_url = server.base_url
+    try:
+        print(json.dumps(asyncio.run(run(base_url.rstrip("/"), args.topic, args.pages)), indent=2))
+    finally:
+        if server:
+            server.stop()
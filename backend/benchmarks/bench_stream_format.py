@@ -0,0 +1,91 @@
+"""
+Compares /api/scrape stream formats: bytes on the wire and CPU per event.
+
+Builds the events of a scrape from synthetic topic pages (page, quote and
+image_ready events), then serializes them with every combination of
+serializer (json, orjson), format (ndjson, compact, msgpack) and
+Content-Encoding (identity, gzip, zstd) available here.
+
+--flush-interval 0 flushes the compressor after every event (a slow live
+scrape, worst case for compression); larger values let events batch up.
+
+Usage (from backend/):
+    python -m benchmarks.bench_stream_format --pages 20
+    python -m benchmarks.bench_stream_format --pages 20 --flush-interval 0.1
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.fixtures import render_topic_page
+from scraper.brainyquote_scraper import _page_events
+from scraper.http_engine import parse_topic_page
+from services import stream_format
+
+STORAGE_URL = "https://project.supabase.co/storage/v1/object/public/quote-images"
+
+
+def scrape_events(topic: str, pages: int) -> list[dict]:
+    events = []
+    for page_number in range(1, pages + 1):
+        result = parse_topic_page(render_topic_page(topic, page_number, last_page=pages))
+        for event in _page_events(result, page_number):
+            events.append(event)
+            if event.get("image_url"):
+                name = event["image_url"].rsplit("/", 1)[-1]
+                events.append({"image_ready": event["link"], "image_url": f"{STORAGE_URL}/{name}"})
+    events.append({"done": True, "total_pages": pages})
+    return events
+
+
+async def measure(events: list[dict], format: str, encoding: str | None, topic: str, flush_interval: float) -> dict:
+    async def source():
+        for event in events:
+            yield event
+
+    size = 0
+    started = time.process_time()
+    async for chunk in stream_format.encode_stream(source(), format, encoding, topic, flush_interval):
+        size += len(chunk)
+    cpu = time.process_time() - started
+    return {"kb": round(size / 1024, 1), "bytes_per_event": round(size / len(events), 1), "cpu_us_per_event": round(cpu / len(events) * 1e6, 2)}
+
+
+async def run(topic: str, pages: int, flush_interval: float) -> dict:
+    events = scrape_events(topic, pages)
+    serializers = {"json": None}
+    if stream_format.orjson is not None:
+        serializers["orjson"] = stream_format.orjson
+    formats = [f for f in stream_format.FORMATS if f != "msgpack" or stream_format.msgpack is not None]
+    encodings = [None] + stream_format.available_encodings()[::-1]
+
+    installed = stream_format.orjson
+    report = {"events": len(events), "results": {}}
+    try:
+        for serializer, module in serializers.items():
+            stream_format.orjson = module
+            for format in formats:
+                # msgpack does not go through the JSON serializer
+                if format == "msgpack" and serializer != "json":
+                    continue
+                for encoding in encodings:
+                    name = f"{format if format == 'msgpack' else f'{serializer}/{format}'}/{encoding or 'identity'}"
+                    report["results"][name] = await measure(events, format, encoding, topic, flush_interval)
+    finally:
+        stream_format.orjson = installed
+
+    baseline = report["results"]["json/ndjson/identity"]["kb"]
+    for result in report["results"].values():
+        result["ratio"] = round(result["kb"] / baseline, 3)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topic", default="benchmark")
+    parser.add_argument("--pages", type=int, default=20, help="Topic pages (60 quotes each)")
+    parser.add_argument("--flush-interval", type=float, default=0.0, help="Compressed stream flush interval (s)")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.topic, args.pages, args.flush_interval)), indent=2))
@@ -0,0 +1,68 @@
+"""
+Synthetic BrainyQuote pages with the same markup the scraper reads
+(#quotesList, .grid-item.bqQt, a.b-qt, a.bq-aut, img.bqphtgrid, ul.pagination).
+"""
+import html
+
+PLACEHOLDER_SRC = "data:image/gif;base64,R0lGODlhAQABAIAAAP///wAAACH5BAEAAAAALAAAAAABAAEAAAICRAEAOw=="
+
+
+def render_quote(topic: str, page: int, idx: int, authors: int = 25) -> str:
+    author_id = idx % authors
+    quote_id = f"{topic}_{page}_{idx}"
+    # Every other image is lazy-loaded, like on the real site
+    if idx % 2:
+        img = f'<img class="bqphtgrid" src="/photos_tr/en/a/author{author_id}.jpg" alt="">'
+    else:
+        img = f'<img class="bqphtgrid" src="{PLACEHOLDER_SRC}" data-src="/photos_tr/en/a/author{author_id}.jpg" alt="">'
+    return (
+        f'<div class="grid-item qb clearfix bqQt">'
+        f'<a href="/quotes/q_{quote_id}" class="oncl_q">{img}</a>'
+        f'<a href="/quotes/q_{quote_id}" class="b-qt oncl_q"><div>Quote {html.escape(quote_id)} about {html.escape(topic)}.</div></a>'
+        f'<a href="/authors/author{author_id}" class="bq-aut oncl_a">Author {author_id}</a>'
+        f'</div>'
+    )
+
+
+def render_pagination(topic: str, page: int, last_page: int) -> str:
+    if last_page <= 1:
+        return ""
+
+    def href(n: int) -> str:
+        return f"/topics/{topic}-quotes" + (f"_{n}" if n > 1 else "")
+
+    items = [
+        f'<li class="page-item{" active" if n == page else ""}"><a class="page-link" href="{href(n)}">{n}</a></li>'
+        for n in range(1, last_page + 1)
+    ]
+    if page < last_page:
+        items.append(f'<li class="page-item"><a class="page-link" href="{href(page + 1)}">Next</a></li>')
+    else:
+        items.append('<li class="page-item disabled"><a class="page-link" href="#">Next</a></li>')
+    return '<ul class="pagination">' + "".join(items) + "</ul>"
+
+
+def render_topic_page(topic: str, page: int = 1, quotes_per_page: int = 60, last_page: int = 1) -> str:
+    items = []
+    for idx in range(1, quotes_per_page + 1):
+        items.append(render_quote(topic, page, idx))
+        # Ads are plain .grid-item and must be skipped by the scraper
+        if idx % 10 == 0:
+            items.append('<div class="grid-item m-ad-brick">Advertisement</div>')
+
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>{html.escape(topic.title())} Quotes - BrainyQuote</title>"
+        # Resources a lean browser profile skips (served by benchmarks.server)
+        '<link rel="stylesheet" href="/static/site.css">'
+        '<link rel="preload" as="font" type="font/woff2" href="/static/font.woff2" crossorigin>'
+        "</head><body>"
+        f"<h1>{html.escape(topic.title())} Quotes</h1>"
+        f'<div id="quotesList">{"".join(items)}</div>'
+        f"{render_pagination(topic, page, last_page)}"
+        "</body></html>"
+    )
+
+
+def render_not_found() -> str:
+    return "<!DOCTYPE html><html><head><title>Page Not Found</title></head><body><h1>Page Not Found</h1></body></html>"
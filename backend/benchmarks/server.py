@@ -0,0 +1,112 @@
+"""
+Local stand-in for BrainyQuote: serves topic pages and author images.
+
+Pages come from recorded HTML files when a fixtures directory is given
+({topic}-quotes.html, {topic}-quotes_2.html, ...), otherwise they are
+generated by benchmarks.fixtures.
+"""
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import render_not_found, render_topic_page
+
+TOPIC_PATH = re.compile(r"^/topics/(?P<topic>[\w-]+?)-quotes(?:_(?P<page>\d+))?$")
+IMAGE_SIZE = 20_000
+STATIC_FILES = {
+    "/static/site.css": (b"body { margin: 0 }\n" * 4_000, "text/css"),
+    "/static/font.woff2": (b"wOF2" + b"\0" * 60_000, "font/woff2"),
+}
+
+
+def fake_image(path: str) -> bytes:
+    """Distinct bytes per image path, so content hashes differ like real portraits."""
+    header = b"\x89PNG\r\n\x1a\n" + path.encode()
+    return header + b"\0" * (IMAGE_SIZE - len(header))
+
+
+class FixtureServer:
+    def __init__(
+        self,
+        pages_per_topic: int = 5,
+        quotes_per_page: int = 60,
+        page_latency: float = 0.05,
+        image_latency: float = 0.01,
+        fixtures_dir: str | None = None,
+    ):
+        self.pages_per_topic = pages_per_topic
+        self.quotes_per_page = quotes_per_page
+        self.page_latency = page_latency
+        self.image_latency = image_latency
+        self.fixtures_dir = fixtures_dir
+        self.requests = {"pages": 0, "images": 0, "static": 0}
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _page(self, topic: str, page: int) -> bytes | None:
+        if self.fixtures_dir:
+            name = f"{topic}-quotes" + (f"_{page}" if page > 1 else "") + ".html"
+            path = os.path.join(self.fixtures_dir, name)
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+
+        if topic == "not-found" or page > self.pages_per_topic:
+            return None
+        return render_topic_page(topic, page, self.quotes_per_page, self.pages_per_topic).encode()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.startswith("/photos_tr/"):
+                    server.requests["images"] += 1
+                    time.sleep(server.image_latency)
+                    self._send(200, fake_image(self.path), "image/png")
+                    return
+
+                if self.path in STATIC_FILES:
+                    server.requests["static"] += 1
+                    self._send(200, *STATIC_FILES[self.path])
+                    return
+
+                match = TOPIC_PATH.match(self.path)
+                server.requests["pages"] += 1
+                time.sleep(server.page_latency)
+                body = server._page(match["topic"], int(match["page"] or 1)) if match else None
+                if body is None:
+                    self._send(404, render_not_found().encode(), "text/html; charset=utf-8")
+                else:
+                    self._send(200, body, "text/html; charset=utf-8")
+
+        return Handler
+
+    def start(self) -> "FixtureServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,37 @@
+"""In-memory stand-ins for the Supabase table and storage APIs."""
+import threading
+import time
+
+
+class MemoryQuoteStore:
+    """Replaces services.supabase_client.save_quotes (multi-row upsert on link)."""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.rows: dict[str, dict] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, rows: list[dict]):
+        time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+            for row in rows:
+                self.rows[row["link"]] = row
+
+
+class MemoryStorage:
+    """Replaces services.supabase_client.upload_image."""
+
+    def __init__(self, latency: float = 0.03):
+        self.latency = latency
+        self.objects: dict[str, bytes] = {}
+        self.uploads = 0
+        self._lock = threading.Lock()
+
+    def upload(self, file_content: bytes, file_name: str, content_type: str = "image/jpeg") -> str:
+        time.sleep(self.latency)
+        with self._lock:
+            self.uploads += 1
+            self.objects[file_name] = file_content
+        return f"https://storage.local/quote-images/{file_name}"
@@ -5,3 +5,98 @@ load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Site to scrape (overridable to point at a local mirror, e.g. for benchmarks)
+BRAINYQUOTE_BASE_URL = os.getenv("BRAINYQUOTE_BASE_URL", "https://www.brainyquote.com").rstrip("/")
+
+# Browser pool (Playwright)
+BROWSER_POOL_MAX_CONTEXTS = int(os.getenv("BROWSER_POOL_MAX_CONTEXTS", "4"))
+BROWSER_POOL_RECYCLE_AFTER = int(os.getenv("BROWSER_POOL_RECYCLE_AFTER", "200"))
+BROWSER_POOL_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_POOL_ACQUIRE_TIMEOUT", "60"))
+# "lean" skips what we never read (images, fonts, CSS, third-party hosts); "full" loads everything
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "lean")
+BROWSER_BLOCKED_RESOURCES = [t.strip() for t in os.getenv("BROWSER_BLOCKED_RESOURCES", "image,media,font,stylesheet").split(",") if t.strip()]
+# Extra hosts lean pages may load from (the scraped site is always allowed)
+BROWSER_ALLOWED_HOSTS = [h.strip() for h in os.getenv("BROWSER_ALLOWED_HOSTS", "").split(",") if h.strip()]
+BROWSER_LEAN_JAVASCRIPT = os.getenv("BROWSER_LEAN_JAVASCRIPT", "true").lower() in ("1", "true", "yes")
+
+# Scraping engines, in fallback order ("http" = browserless, "playwright" = headless Chromium)
+SCRAPER_ENGINES = [name.strip() for name in os.getenv("SCRAPER_ENGINES", "http,playwright").split(",") if name.strip()]
+# "batch" (one evaluate per page) or "element" (one query per quote field)
+SCRAPER_EXTRACT_MODE = os.getenv("SCRAPER_EXTRACT_MODE", "batch")
+
+# Pagination: pages of a topic are fetched concurrently, politely per host
+SCRAPER_MAX_PAGES = int(os.getenv("SCRAPER_MAX_PAGES", "20"))
+SCRAPER_HOST_CONCURRENCY = int(os.getenv("SCRAPER_HOST_CONCURRENCY", "4"))
+SCRAPER_HOST_RATE = float(os.getenv("SCRAPER_HOST_RATE", "2"))  # requests per second, 0 = unlimited
+SCRAPER_HOST_BURST = float(os.getenv("SCRAPER_HOST_BURST", "4"))
+
+# Page waits: timeouts follow the measured durations (EWMA), between the floor and these ceilings (seconds)
+SCRAPER_TIMEOUT_FLOOR = float(os.getenv("SCRAPER_TIMEOUT_FLOOR", "3"))
+SCRAPER_GOTO_TIMEOUT = float(os.getenv("SCRAPER_GOTO_TIMEOUT", "30"))
+SCRAPER_SELECTOR_TIMEOUT = float(os.getenv("SCRAPER_SELECTOR_TIMEOUT", "10"))
+SCRAPER_HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "15"))
+SCRAPER_THROTTLE_BACKOFF = float(os.getenv("SCRAPER_THROTTLE_BACKOFF", "5"))  # pause after a 429 without Retry-After
+# Retries of a page with the same engine after a 429 or an adaptive timeout, before falling back
+SCRAPER_PAGE_RETRIES = int(os.getenv("SCRAPER_PAGE_RETRIES", "2"))
+# Screenshot and HTML of pages where no quote showed up ("" = not captured)
+SCRAPER_DEBUG_DIR = os.getenv("SCRAPER_DEBUG_DIR", "")
+
+# Incremental re-scrapes: only new quotes are sent and saved, pagination stops at known pages
+SCRAPER_INCREMENTAL = os.getenv("SCRAPER_INCREMENTAL", "false").lower() in ("1", "true", "yes")
+SCRAPER_INCREMENTAL_LOOKAHEAD = int(os.getenv("SCRAPER_INCREMENTAL_LOOKAHEAD", "2"))
+SEEN_INDEX_DIR = os.getenv("SEEN_INDEX_DIR", "cache/seen")
+SEEN_INDEX_MAX_TOPICS = int(os.getenv("SEEN_INDEX_MAX_TOPICS", "200"))
+
+# Multi-topic batches: pages of all topics share one scheduler and one page budget
+SCRAPER_BATCH_MAX_TOPICS = int(os.getenv("SCRAPER_BATCH_MAX_TOPICS", "50"))
+SCRAPER_BATCH_CONCURRENCY = int(os.getenv("SCRAPER_BATCH_CONCURRENCY", "8"))
+SCRAPER_BATCH_PAGE_BUDGET = int(os.getenv("SCRAPER_BATCH_PAGE_BUDGET", "200"))  # 0 = unlimited
+
+# Image pipeline: download -> storage upload -> persistence, each stage with a bounded queue
+IMAGE_DOWNLOAD_WORKERS = int(os.getenv("IMAGE_DOWNLOAD_WORKERS", "4"))
+IMAGE_UPLOAD_WORKERS = int(os.getenv("IMAGE_UPLOAD_WORKERS", "2"))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+
+# Quote persistence: multi-row upserts flushed by size or time
+QUOTE_BATCH_SIZE = int(os.getenv("QUOTE_BATCH_SIZE", "50"))
+QUOTE_FLUSH_INTERVAL = float(os.getenv("QUOTE_FLUSH_INTERVAL", "2"))
+
+# Image cache: source URL / content hash -> stored public URL
+IMAGE_CACHE_PATH = os.getenv("IMAGE_CACHE_PATH", "cache/images.sqlite3")
+IMAGE_CACHE_LRU_SIZE = int(os.getenv("IMAGE_CACHE_LRU_SIZE", "5000"))
+
+# Topic result cache: fresh for TTL seconds, then served stale (with a background refresh) for STALE_TTL more
+TOPIC_CACHE_DIR = os.getenv("TOPIC_CACHE_DIR", "cache/topics")
+TOPIC_CACHE_TTL = float(os.getenv("TOPIC_CACHE_TTL", "3600"))
+TOPIC_CACHE_STALE_TTL = float(os.getenv("TOPIC_CACHE_STALE_TTL", "86400"))
+TOPIC_CACHE_MAX_ENTRIES = int(os.getenv("TOPIC_CACHE_MAX_ENTRIES", "100"))
+
+# Image downloads: one shared HTTP client
+IMAGE_HTTP_MAX_CONNECTIONS = int(os.getenv("IMAGE_HTTP_MAX_CONNECTIONS", "20"))
+IMAGE_DOWNLOAD_CONCURRENCY = int(os.getenv("IMAGE_DOWNLOAD_CONCURRENCY", "8"))
+IMAGE_DOWNLOAD_RETRIES = int(os.getenv("IMAGE_DOWNLOAD_RETRIES", "2"))
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# Background jobs: worker processes running scrapes (0 = run them inside the API process)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOBS_PER_WORKER = int(os.getenv("JOBS_PER_WORKER", "4"))
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))  # seconds a finished job stays readable
+
+# Stored quotes API: keyset pages, exports, in-memory index of hot topics
+QUOTES_PAGE_MAX = int(os.getenv("QUOTES_PAGE_MAX", "200"))
+QUOTE_EXPORT_PAGE_SIZE = int(os.getenv("QUOTE_EXPORT_PAGE_SIZE", "1000"))
+QUOTE_INDEX_TTL = float(os.getenv("QUOTE_INDEX_TTL", "300"))
+QUOTE_INDEX_HOT_AFTER = int(os.getenv("QUOTE_INDEX_HOT_AFTER", "2"))  # requests for a topic within the TTL
+QUOTE_INDEX_MAX_TOPICS = int(os.getenv("QUOTE_INDEX_MAX_TOPICS", "20"))
+QUOTE_INDEX_MAX_ROWS = int(os.getenv("QUOTE_INDEX_MAX_ROWS", "20000"))  # larger topics stay in the database
+
+# Response streams: gzip/zstd when the client accepts it ("off" to disable), flushed at least this often
+STREAM_COMPRESSION = os.getenv("STREAM_COMPRESSION", "auto")
+STREAM_COMPRESSION_LEVEL = int(os.getenv("STREAM_COMPRESSION_LEVEL", "0")) or None  # 0 = codec default
+STREAM_FLUSH_INTERVAL = float(os.getenv("STREAM_FLUSH_INTERVAL", "0.1"))
+
+# Timing histograms and counters of the scrape steps, served at /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# Allows /api/scrape?trace=true: each traced request runs an uncached scrape, so keep it off for public deployments
+SCRAPE_TRACE_ENABLED = os.getenv("SCRAPE_TRACE_ENABLED", "false").lower() in ("1", "true", "yes")
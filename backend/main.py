@@ -1,14 +1,32 @@
-import json
+import csv
+import io
 import logging
+import re
 import sys
 import asyncio
-from fastapi import FastAPI, Query
-from fastapi.responses import StreamingResponse
+from contextlib import asynccontextmanager
+from functools import partial
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from scraper.brainyquote_scraper import scrape_brainyquote_generator
-from services.supabase_client import save_quote, upload_image
-from services.image_downloader import download_image
-import uuid
+from pydantic import BaseModel, Field
+from config import QUOTES_PAGE_MAX, SCRAPE_TRACE_ENABLED, SCRAPER_BATCH_MAX_TOPICS, SCRAPER_INCREMENTAL
+from repositories.quote_repository import QUOTE_FIELDS, QuoteRepository
+from scraper.brainyquote_scraper import close_engines, default_engines, engine_metrics
+from scraper.browser_pool import browser_pool
+from scraper.metrics import metrics, render_gauges
+from scraper.scheduler import PageScheduler
+from scraper.utils import normalize_topic
+from services.supabase_client import fetch_quote_keys, save_quotes, upload_image
+from services.image_cache import image_cache
+from services.image_downloader import close_client as close_image_client
+from services.quote_writer import QuoteBatchWriter
+from services.scrape_stream import batch_events, enriched_events
+from services.seen_index import SeenIndex
+from services.quote_search import QuoteSearch
+from services.stream_format import MEDIA_TYPES, encode_stream, msgpack, negotiate_encoding
+from services.topic_cache import TopicCache
+from services.jobs import JobManager
 
 # Fix for Playwright on Windows
 if sys.platform == "win32":
@@ -18,7 +36,47 @@ if sys.platform == "win32":
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# Incremental mode: re-scrapes only send and save quotes that are not stored yet
+seen_index = SeenIndex(loader=fetch_quote_keys) if SCRAPER_INCREMENTAL else None
+# Reads of stored quotes; hot topics are answered from memory
+quote_search = QuoteSearch(QuoteRepository.list_quotes)
+
+async def on_quotes_saved(rows: list[dict]):
+    quote_search.invalidate(rows)
+    if seen_index:
+        await seen_index.record(rows)
+
+quote_writer = QuoteBatchWriter(save_quotes, on_saved=on_quotes_saved)
+# Popular topics are replayed from cache; concurrent requests share one scrape
+topic_stream = partial(enriched_events, upload=upload_image, writer=quote_writer, cache=image_cache, seen=seen_index)
+topic_cache = TopicCache(topic_stream, store=seen_index is None)
+# Multi-topic scrapes: pages of all topics go through one scheduler per batch
+batch_stream = partial(batch_events, upload=upload_image, writer=quote_writer, cache=image_cache, seen=seen_index)
+# Background scrapes, run by worker processes (or in-process when JOB_WORKERS=0)
+job_manager = JobManager(topic_stream)
+# Quotes saved by job workers never reach on_quotes_saved: topics being scraped by a job skip the memory index
+quote_search.busy = job_manager.running
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One shared Chromium for the whole process instead of one per request.
+    # It is launched lazily unless Playwright is the primary engine.
+    if default_engines()[0].name == "playwright":
+        await browser_pool.start()
+    quote_writer.start()
+    job_manager.start()
+    try:
+        yield
+    finally:
+        await job_manager.close()
+        await topic_cache.close()
+        await quote_writer.close()
+        await close_engines()
+        await close_image_client()
+        image_cache.close()
+        await browser_pool.close()
+
+app = FastAPI(lifespan=lifespan)
 
 # Autoriser le frontend Nuxt à accéder à l'API
 app.add_middleware(
@@ -28,54 +86,152 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+@app.get("/api/pool")
+async def api_pool():
+    return browser_pool.metrics()
+
+@app.get("/api/stats")
+async def api_stats():
+    return {
+        "browser_pool": browser_pool.metrics(),
+        "engines": engine_metrics(),
+        "quote_writer": quote_writer.metrics(),
+        "image_cache": image_cache.metrics(),
+        "topic_cache": topic_cache.metrics(),
+        "jobs": job_manager.metrics(),
+        "incremental": seen_index.metrics() if seen_index else None,
+        "quote_search": quote_search.metrics(),
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    # Step timings and counters of this process (job worker processes keep their own)
+    components = {
+        "browser_pool": browser_pool.metrics(),
+        "quote_writer": quote_writer.metrics(),
+        "image_cache": image_cache.metrics(),
+        "topic_cache": topic_cache.metrics(),
+        "jobs": job_manager.metrics(),
+    }
+    body = metrics.render() + "".join(render_gauges(name, values) for name, values in components.items())
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _stream_response(request: Request, events, format: str = "ndjson", topic: str | None = None) -> StreamingResponse:
+    """NDJSON (or msgpack) event stream, gzip/zstd-compressed when the client accepts it."""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(
+        encode_stream(events, format, encoding, topic), media_type=MEDIA_TYPES[format], headers=headers
+    )
+
 @app.get("/api/scrape")
-async def api_scrape(topic: str = Query(..., description="Sujet à scraper")):
-    async def event_generator():
-        try:
-            async for data in scrape_brainyquote_generator(topic):
-                # Save to Supabase if it's a quote item (has text and author)
-                if "text" in data and "author" in data:
-                    # Enrich with topic
-                    data["topic"] = topic
-                    
-                    # Handle Image Logic
-                    original_image_url = data.get("image_url")
-                    if original_image_url:
-                        try:
-                            logger.info(f"Downloading image from {original_image_url}...")
-                            download_result = await download_image(original_image_url)
-                            
-                            if download_result:
-                                image_content, mime_type = download_result
-                                # Create a unique filename
-                                suffix = "jpg"
-                                if "png" in mime_type:
-                                    suffix = "png"
-                                elif "webp" in mime_type:
-                                    suffix = "webp"
-                                    
-                                filename = f"{topic}/{uuid.uuid4()}.{suffix}"
-                                logger.info(f"Uploading image to {filename} (Type: {mime_type})...")
-                                public_url = upload_image(image_content, filename, content_type=mime_type)
-                                
-                                if public_url:
-                                    logger.info(f"Image uploaded successfully: {public_url}")
-                                    data["image_url"] = public_url
-                                else:
-                                    logger.warning("Failed to upload image, keeping original URL (or None)")
-                            else:
-                                logger.warning("Failed to download image content")
-                        except Exception as img_err:
-                            logger.error(f"Error processing image: {img_err}")
-
-                    save_quote(data)
-                
-                # Using Server-Sent Events (SSE) or just Newline Delimited JSON (NDJSON)
-                # NDJSON is easier to parse manually on client in a simple loop
-                yield json.dumps(data) + "\n"
-        except Exception as e:
-            logger.error(f"Stream error: {e}")
-            yield json.dumps({"error": f"Stream interrupted: {str(e)}"}) + "\n"
-
-    return StreamingResponse(event_generator(), media_type="application/x-ndjson")
+async def api_scrape(
+    request: Request,
+    topic: str = Query(..., description="Sujet à scraper"),
+    format: str = Query("ndjson", pattern="^(ndjson|compact|msgpack)$", description="ndjson, compact (NDJSON abrégé) ou msgpack"),
+    trace: bool = Query(False, description="Ajoute un résumé des temps par étape avant le message final (scrape sans cache)"),
+):
+    if format == "msgpack" and msgpack is None:
+        raise HTTPException(status_code=422, detail="Format msgpack indisponible (paquet 'msgpack' non installé)")
+    if trace and not SCRAPE_TRACE_ENABLED:
+        raise HTTPException(status_code=403, detail="Trace désactivée (SCRAPE_TRACE_ENABLED=false)")
+    # A traced request runs its own scrape: a cache replay would measure nothing
+    events = topic_stream(topic, trace=True) if trace else topic_cache.stream(topic)
+    # NDJSON is easier to parse manually on client in a simple loop
+    return _stream_response(request, events, format, topic)
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in QUOTE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Champs inconnus : {', '.join(unknown)} (disponibles : {', '.join(QUOTE_FIELDS)})")
+    return names or None
+
+@app.get("/api/quotes")
+async def api_quotes(
+    request: Request,
+    topic: str | None = Query(None, description="Filtrer par sujet"),
+    author: str | None = Query(None, description="Filtrer par auteur (exact, insensible à la casse)"),
+    q: str | None = Query(None, description="Recherche plein texte : tous les mots doivent apparaître"),
+    fields: str | None = Query(None, description="Colonnes à renvoyer, séparées par des virgules"),
+    cursor: int | None = Query(None, ge=0, description="Valeur next_cursor de la page précédente"),
+    limit: int = Query(50, ge=1, le=QUOTES_PAGE_MAX),
+    format: str = Query("json", pattern="^(json|ndjson|csv)$", description="json (une page) ou export complet ndjson/csv"),
+):
+    columns = _parse_fields(fields)
+    filters = {"topic": topic, "author": author, "search": q}
+
+    if format == "json":
+        quotes, next_cursor = await quote_search.page(limit, cursor, fields=columns, **filters)
+        return {"quotes": quotes, "next_cursor": next_cursor}
+
+    # Export: streamed page by page, so memory does not grow with the number of quotes
+    rows = quote_search.export(cursor, fields=columns, **filters)
+    if format == "ndjson":
+        return _stream_response(request, rows)
+
+    header = columns or list(QUOTE_FIELDS)
+
+    async def csv_generator():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        async for row in rows:
+            writer.writerow([row.get(name) for name in header])
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    slug = re.sub(r"[^\w-]", "", normalize_topic(topic)) if topic else ""
+    filename = f"citations-{slug}.csv" if slug else "citations.csv"
+    return StreamingResponse(
+        csv_generator(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+class BatchRequest(BaseModel):
+    topics: list[str] = Field(..., min_length=1, description="Sujets à scraper")
+    page_budget: int | None = Field(None, ge=0, description="Nombre total de pages pour le lot (0 = illimité)")
+
+@app.post("/api/scrape/batch")
+async def api_scrape_batch(request: Request, batch: BatchRequest):
+    # One scrape per distinct topic, in the order given
+    topics = list(dict.fromkeys(t for t in (normalize_topic(t) for t in batch.topics) if t))
+    if not topics:
+        raise HTTPException(status_code=422, detail="Aucun sujet valide")
+    if len(topics) > SCRAPER_BATCH_MAX_TOPICS:
+        raise HTTPException(status_code=422, detail=f"Trop de sujets (maximum {SCRAPER_BATCH_MAX_TOPICS})")
+
+    scheduler = PageScheduler() if batch.page_budget is None else PageScheduler(page_budget=batch.page_budget)
+    return _stream_response(request, batch_stream(topics, scheduler=scheduler))
+
+@app.post("/api/jobs")
+async def api_create_job(topic: str = Query(..., description="Sujet à scraper")):
+    job = job_manager.submit(topic)
+    return job.to_dict()
+
+def _get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job introuvable")
+    return job
+
+@app.get("/api/jobs/{job_id}")
+async def api_job(job_id: str):
+    return _get_job(job_id).to_dict()
 
+@app.get("/api/jobs/{job_id}/stream")
+async def api_job_stream(
+    request: Request,
+    job_id: str,
+    offset: int = Query(0, ge=0, description="Nombre d'événements déjà reçus (reprise après reconnexion)"),
+):
+    job = _get_job(job_id)
+    return _stream_response(request, job.log.follow(offset))
@@ -1,5 +1,14 @@
 from services.supabase_client import supabase
-from typing import List, Optional, Dict
+from scraper.utils import topic_pattern
+from typing import Dict, Iterator, List, Optional
+
+# Colonnes lisibles par l'API (projection)
+QUOTE_FIELDS = ("id", "created_at", "text", "author", "topic", "link", "image_url")
+
+
+def _escape_like(value: str) -> str:
+    """Échappe les jokers de ILIKE pour une comparaison exacte (insensible à la casse)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("*", "")
 
 class QuoteRepository:
     TABLE_NAME = "quotes"
@@ -8,37 +17,82 @@ class QuoteRepository:
     def insert_quote(quote: Dict) -> Optional[Dict]:
         """
         Insère une citation dans la table quotes.
-        Evite les doublons sur le champ 'text'.
+        Evite les doublons sur le champ 'link'.
         quote: {
             "text": str,
             "author": str,
             "link": str
         }
         """
-        # Vérifier si la citation existe déjà
-        existing = supabase.table(QuoteRepository.TABLE_NAME)\
-            .select("id")\
-            .eq("text", quote["text"])\
-            .execute()
-
-        if existing.data and len(existing.data) > 0:
-            return None  
-        
-        # Insérer la citation
+        # Un seul aller-retour : les doublons (contrainte unique sur 'link') sont ignorés
         result = supabase.table(QuoteRepository.TABLE_NAME)\
-            .insert(quote)\
+            .upsert(quote, on_conflict="link", ignore_duplicates=True)\
             .execute()
 
         return result.data[0] if result.data else None
 
     @staticmethod
-    def get_all_quotes() -> List[Dict]:
-        """Récupère toutes les citations"""
+    def insert_quotes(quotes: List[Dict]) -> List[Dict]:
+        """
+        Insère plusieurs citations en une seule requête.
+        Retourne uniquement les citations nouvellement insérées.
+        """
+        if not quotes:
+            return []
         result = supabase.table(QuoteRepository.TABLE_NAME)\
-            .select("*")\
+            .upsert(quotes, on_conflict="link", ignore_duplicates=True)\
             .execute()
         return result.data or []
 
+    @staticmethod
+    def list_quotes(
+        limit: int = 50,
+        after_id: Optional[int] = None,
+        topic: Optional[str] = None,
+        author: Optional[str] = None,
+        search: Optional[str] = None,
+        columns: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """
+        Une page de citations triées par id (pagination par curseur :
+        `after_id` est l'id de la dernière citation de la page précédente).
+        `search` : tous les mots doivent apparaître dans le texte (recherche plein texte).
+        L'id est toujours sélectionné, pour construire le curseur suivant.
+        """
+        columns = list(dict.fromkeys(["id", *(columns or QUOTE_FIELDS)]))
+        query = supabase.table(QuoteRepository.TABLE_NAME).select(",".join(columns))
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        if topic:
+            # Sujets enregistrés tels que saisis par le passé : toutes les graphies du même sujet
+            query = query.filter("topic", "imatch", topic_pattern(topic))
+        if author:
+            query = query.ilike("author", _escape_like(author))
+        if search:
+            # Configuration "simple" : mots entiers, sans racinisation
+            query = query.filter("text", "plfts(simple)", search)
+        result = query.order("id").limit(limit).execute()
+        return result.data or []
+
+    @staticmethod
+    def iter_quotes(page_size: int = 1000, **filters) -> Iterator[Dict]:
+        """
+        Parcourt toutes les citations correspondant aux filtres de list_quotes,
+        page par page (mémoire constante, pas de limite de lignes de PostgREST).
+        """
+        after_id = filters.pop("after_id", None)
+        while True:
+            rows = QuoteRepository.list_quotes(limit=page_size, after_id=after_id, **filters)
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after_id = rows[-1]["id"]
+
+    @staticmethod
+    def get_all_quotes() -> List[Dict]:
+        """Récupère toutes les citations"""
+        return list(QuoteRepository.iter_quotes())
+
     @staticmethod
     def count_quotes() -> int:
         """Compte le nombre de citations"""
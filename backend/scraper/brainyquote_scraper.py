@@ -1,167 +1,266 @@
 import logging
 import asyncio
-from playwright.async_api import async_playwright
+from functools import partial
+
+from config import (
+    SCRAPER_ENGINES,
+    SCRAPER_EXTRACT_MODE,
+    SCRAPER_INCREMENTAL_LOOKAHEAD,
+    SCRAPER_MAX_PAGES,
+    SCRAPER_PAGE_RETRIES,
+)
+from scraper.browser_pool import browser_pool
+from scraper.engine import EngineFallback, PageResult, ScrapeEngine
+from scraper.http_engine import HttpEngine
+from scraper.metrics import metrics
+from scraper.playwright_engine import PlaywrightEngine
+from scraper.rate_limit import HostLimiter, host_limiter
+from scraper.scheduler import BUDGET_EXHAUSTED, PageScheduler
+from scraper.utils import build_quote, normalize_topic, quote_key, topic_page_url
 
 logger = logging.getLogger(__name__)
 
-async def scrape_brainyquote_generator(topic: str):
+ENGINES: dict[str, ScrapeEngine] = {
+    "http": HttpEngine(),
+    "playwright": PlaywrightEngine(browser_pool, extract_mode=SCRAPER_EXTRACT_MODE),
+}
+
+def default_engines() -> list[ScrapeEngine]:
+    """Engines in fallback order, from the SCRAPER_ENGINES setting."""
+    return [ENGINES[name] for name in SCRAPER_ENGINES if name in ENGINES]
+
+async def close_engines():
+    for engine in ENGINES.values():
+        await engine.close()
+
+def engine_metrics() -> dict:
+    """Adaptive timeouts of each engine, exposed by the API."""
+    return {name: engine.metrics() for name, engine in ENGINES.items()}
+
+
+class _EngineChain:
+    """
+    Fetches pages with the first engine that succeeds, through the per-host limiter.
+
+    Transient failures (429, adaptive timeout) are retried up to `retries`
+    times with the same engine; after a 429 the limiter holds the retry
+    until the site's pause is over. Once an engine failed for good (bot
+    detection, no quotes...), the fallback is kept for the following pages
+    of the scrape.
+    """
+
+    def __init__(self, engines: list[ScrapeEngine], limiter: HostLimiter, retries: int = SCRAPER_PAGE_RETRIES):
+        self.engines = engines
+        self.limiter = limiter
+        self.retries = retries
+        self.index = 0
+
+    async def _attempt(self, engine: ScrapeEngine, url: str, page_number: int) -> tuple[PageResult | None, EngineFallback | None]:
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.limiter.limit(url):
+                    return await engine.fetch_page(url, page_number), None
+            except EngineFallback as e:
+                if e.retry_after:
+                    self.limiter.pause(url, e.retry_after)
+                if not e.transient or attempt == self.retries:
+                    return None, e
+                metrics.count("scraper_pages_total", engine=engine.name, outcome="retry")
+                logger.warning(f"Engine '{engine.name}' failed on page {page_number}, retrying: {e}")
+
+    async def fetch(self, url: str, page_number: int) -> tuple[PageResult | None, str | None]:
+        """
+        Returns (result, failure_message); result is None if every engine gave
+        up. Past page 1, a page every engine found empty is an empty result
+        (end of the topic), not a failure.
+        """
+        failure = None
+        # Only engines that failed for good are skipped on the next pages
+        settled = True
+        empty = True
+        for index in range(self.index, len(self.engines)):
+            engine = self.engines[index]
+            result, error = await self._attempt(engine, url, page_number)
+            if error is not None:
+                failure = str(error)
+                settled = settled and not error.transient
+                empty = empty and error.empty
+                metrics.count("scraper_pages_total", engine=engine.name, outcome="fallback")
+                logger.warning(f"Engine '{engine.name}' gave up on page {page_number}: {error}")
+                continue
+
+            if settled:
+                self.index = max(self.index, index)
+            metrics.count("scraper_pages_total", engine=engine.name, outcome="not_found" if result.not_found else "ok")
+            logger.info(f"Found {len(result.records)} quotes on page {page_number} ({engine.name}).")
+            return result, None
+        if empty and failure is not None and page_number > 1:
+            logger.info(f"No quotes on page {page_number} ({failure})")
+            return PageResult(), None
+        return None, failure
+
+
+def _page_events(result: PageResult, page_number: int):
+    total_on_page = len(result.records)
+
+    # Send information about this page to initialize/reset progress bar for this page
+    yield {"total": total_on_page, "page": page_number}
+
+    for idx, record in enumerate(result.records, start=1):
+        quote = build_quote(record)
+        if not quote:
+            yield {"progress": idx, "total": total_on_page}
+            continue
+
+        yield {
+            **quote,
+            "page": page_number,
+            "progress": idx,
+            "total": total_on_page
+        }
+
+def _page_failed(page_number: int, failure: str | None) -> dict:
+    logger.error(f"Page {page_number} could not be loaded: {failure}")
+    return {"error": f"La page {page_number} n'a pas pu être chargée ({failure}). Résultat incomplet, réessayez plus tard."}
+
+def _drop_known(result: PageResult, known: set[str]) -> int:
+    """Removes already-stored quotes from the page; returns how many were removed."""
+    fresh = []
+    for record in result.records:
+        quote = build_quote(record)
+        if quote is None or quote_key(quote) not in known:
+            fresh.append(record)
+    skipped = len(result.records) - len(fresh)
+    result.records = fresh
+    return skipped
+
+async def scrape_brainyquote_generator(
+    topic: str,
+    engines: list[ScrapeEngine] | None = None,
+    max_pages: int = SCRAPER_MAX_PAGES,
+    limiter: HostLimiter = host_limiter,
+    scheduler: PageScheduler | None = None,
+    known: set[str] | None = None,
+):
     """
     Scrapes BrainyQuote for a given topic, yielding results asynchronously.
+
+    Page 1 gives the page count; the remaining pages ({topic}-quotes_2, ...)
+    are then fetched concurrently, bounded by the per-host limiter, and
+    streamed in page order. When the pagination shows no page numbers, the
+    Next links are followed one by one.
+
+    With a `scheduler` (multi-topic batches), page fetches are queued there
+    and share its workers and page budget with the other topics.
+
+    With `known` (keys of the quotes already stored, see quote_key), the
+    scrape is incremental: only new quotes are yielded, pages are fetched a
+    few at a time, and pagination stops at the first page made only of
+    known quotes. The done event then reports pages_skipped/quotes_skipped.
+
+    A page that no engine could load (throttled, timed out, blocked...)
+    ends the stream with an error event, not a done event: the result is
+    incomplete and must not be cached. An empty page ends it normally.
     """
-    topic = topic.strip().lower().replace(" ", "-")
-    url = f"https://www.brainyquote.com/topics/{topic}-quotes"
-    
+    topic = normalize_topic(topic)
+    url = topic_page_url(topic)
+    chain = _EngineChain(engines or default_engines(), limiter)
+    if scheduler is None:
+        fetch = chain.fetch
+    else:
+        fetch = partial(scheduler.fetch, topic, chain)
+
     logger.info(f"Starting scrape for topic: {topic} at {url}")
 
-    async with async_playwright() as p:
-        # Launch browser
-        browser = await p.chromium.launch(headless=True)
-        # Use a real user agent to avoid basic bot detection
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        try:
-            page = await context.new_page()
-            
-            # Navigate to the first page
-            try:
-                await page.goto(url, timeout=60000, wait_until="domcontentloaded")
-            except Exception as e:
-                logger.error(f"Failed to load page: {e}")
-                yield {"error": f"Failed to load page: {str(e)}"}
-                return
+    quotes_skipped = 0
+
+    def caught_up(result: PageResult) -> bool:
+        """Filters known quotes out of the page; True if nothing on it was new."""
+        nonlocal quotes_skipped
+        if known is None:
+            return False
+        skipped = _drop_known(result, known)
+        quotes_skipped += skipped
+        return skipped > 0 and not result.records
 
-            page_number = 1
-            max_pages = 20 # Safety limit
-
-            while page_number <= max_pages:
-                logger.info(f"Scraping page {page_number} for topic '{topic}'")
-
-                # Check for "Page Not Found" (invalid topic) on first page mainly
-                if page_number == 1:
-                    try:
-                        title = await page.title()
-                        h1_text = await page.evaluate("() => document.querySelector('h1') ? document.querySelector('h1').innerText : ''")
-                        
-                        if "Page Not Found" in title or "Page Not Found" in h1_text:
-                            logger.warning(f"Topic '{topic}' not found.")
-                            yield {"error": f"Le sujet '{topic}' n'a pas été trouvé. Essayez un autre terme."}
-                            return
-                    except Exception as e:
-                        logger.warning(f"Error checking 404 state: {e}")
-
-                # Wait for grid items to appear
-                try:
-                    # Wait for the container first
-                    await page.wait_for_selector("#quotesList", timeout=15000)
-                    # Then wait for items
-                    await page.wait_for_selector(".grid-item.bqQt", timeout=15000)
-                except Exception as e:
-                    logger.warning(f"No quotes found on page {page_number} (selector timed out): {e}")
-                    if page_number == 1:
-                        # Only critical if it's the first page
-                        # Debug: log content length and take screenshot
-                        content = await page.content()
-                        logger.info(f"Page content length: {len(content)}")
-                        
-                        screenshot_path = f"debug_screenshot_{topic}_p{page_number}.png"
-                        await page.screenshot(path=screenshot_path)
-                        logger.info(f"Saved debug screenshot to {screenshot_path}")
-                        
-                        yield {"error": "No quotes found. The site might be blocking the scraper."}
+    try:
+        result, failure = await fetch(url, 1)
+
+        if result is None:
+            yield {"error": failure or "No quotes found. The site might be blocking the scraper."}
+            return
+
+        # Check for "Page Not Found" (invalid topic)
+        if result.not_found:
+            logger.warning(f"Topic '{topic}' not found.")
+            yield {"error": f"Le sujet '{topic}' n'a pas été trouvé. Essayez un autre terme."}
+            return
+
+        last_page = min(result.last_page or 1, max_pages)
+        stopped = caught_up(result)
+        if not stopped:
+            for event in _page_events(result, 1):
+                yield event
+        pages_done = 1
+
+        if last_page > 1 and not stopped:
+            # Incremental scrapes only look a few pages ahead, since they may stop early
+            window = last_page if known is None else max(SCRAPER_INCREMENTAL_LOOKAHEAD, 1)
+            logger.info(f"Fetching pages 2-{last_page} of '{topic}' ({window} at a time)")
+            tasks: dict[int, asyncio.Task] = {}
+            try:
+                for page_number in range(2, last_page + 1):
+                    for ahead in range(page_number, min(page_number + window, last_page + 1)):
+                        if ahead not in tasks:
+                            tasks[ahead] = asyncio.create_task(fetch(topic_page_url(topic, ahead), ahead))
+                    result, failure = await tasks[page_number]
+                    if result is None and failure != BUDGET_EXHAUSTED:
+                        yield _page_failed(page_number, failure)
                         return
-                    else:
-                        logger.info("No more quotes found on this page, stopping.")
+                    if result is None or result.not_found or not result.records:
+                        logger.info(f"No more quotes found on page {page_number}, stopping.")
+                        stopped = True
                         break
-
-                # Select only actual quote items (exclude ads which are just .grid-item)
-                quote_elements = await page.query_selector_all(".grid-item.bqQt")
-                total_on_page = len(quote_elements)
-                logger.info(f"Found {total_on_page} quotes on page {page_number}.")
-                
-                # Send information about this page to initialize/reset progress bar for this page
-                yield {"total": total_on_page, "page": page_number}
-
-                for idx, el in enumerate(quote_elements, start=1):
-                    try:
-                        text_el = await el.query_selector("a.b-qt")
-                        author_el = await el.query_selector("a.bq-aut")
-                        
-                        # Try finding image
-                        img_el = await el.query_selector("img.bqphtgrid")
-                        img_src = None
-                        if img_el:
-                            img_src = await img_el.get_attribute("src")
-                            if not img_src or "base64" in img_src:
-                                data_src = await img_el.get_attribute("data-src")
-                                if data_src:
-                                    img_src = data_src
-                            
-                            if img_src and img_src.startswith("/"):
-                                img_src = "https://www.brainyquote.com" + img_src
-
-                        if not text_el or not author_el:
-                            yield {"progress": idx, "total": total_on_page}
-                            continue
-
-                        text = (await text_el.inner_text()).strip()
-                        author = (await author_el.inner_text()).strip()
-                        link = "https://www.brainyquote.com" + (await text_el.get_attribute("href") or "")
-
-                        yield {
-                            "text": text,
-                            "author": author,
-                            "link": link,
-                            "image_url": img_src,
-                            "page": page_number,
-                            "progress": idx,
-                            "total": total_on_page
-                        }
-                        
-                        # Small delay
-                        await asyncio.sleep(0.05)
-                        
-                    except Exception as item_error:
-                        logger.error(f"Error scraping item {idx} on page {page_number}: {item_error}")
-                        yield {"progress": idx, "total": total_on_page}
-                        continue
-                
-                # Pagination Logic
-                try:
-                    # Look for "Next" button/link. BrainyQuote usually has a "Next" text or an icon.
-                    # We try to find a link that contains "Next" or has a class indicative of next page.
-                    # Usually: <ul class="pagination"> ... <li><a href="...">Next</a></li>
-                    
-                    next_button = await page.query_selector("ul.pagination li.page-item:last-child a")
-                    # Or try text match if class structure changed
-                    if not next_button:
-                        next_button = await page.get_by_text("Next", exact=True).element_handle()
-                    
-                    if next_button:
-                        # Check if it's disabled (sometimes 'disabled' class on li)
-                        parent_li = await next_button.evaluate_handle("el => el.parentElement")
-                        class_name = await parent_li.get_attribute("class")
-                        if class_name and "disabled" in class_name:
-                            logger.info("Next button is disabled. End of pagination.")
-                            break
-                        
-                        logger.info("Next button found, navigating to next page...")
-                        await next_button.click()
-                        await page.wait_for_load_state("domcontentloaded")
-                        page_number += 1
-                        await asyncio.sleep(1) # Be polite
-                    else:
-                        logger.info("No Next button found. End of pagination.")
+                    pages_done = page_number
+                    if caught_up(result):
+                        logger.info(f"Page {page_number} of '{topic}' is already known, stopping.")
+                        stopped = True
                         break
-                        
-                except Exception as pag_error:
-                    logger.warning(f"Error during pagination check: {pag_error}")
-                    break
-
-            yield {"done": True, "total_pages": page_number}
-
-        except Exception as e:
-            logger.error(f"Global error in scraper: {e}")
-            yield {"error": str(e)}
-        finally:
-            await browser.close()
+                    for event in _page_events(result, page_number):
+                        yield event
+            finally:
+                for task in tasks.values():
+                    task.cancel()
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        # Follow the Next links sequentially past the listed pages
+        # (or for the whole topic when the pagination shows no page numbers)
+        while not stopped and result.next_url and pages_done < max_pages:
+            page_number = pages_done + 1
+            result, failure = await fetch(result.next_url, page_number)
+            if result is None and failure != BUDGET_EXHAUSTED:
+                yield _page_failed(page_number, failure)
+                return
+            if result is None or result.not_found or not result.records:
+                logger.info("No more quotes found on this page, stopping.")
+                break
+            pages_done = page_number
+            if caught_up(result):
+                logger.info(f"Page {page_number} of '{topic}' is already known, stopping.")
+                break
+            for event in _page_events(result, page_number):
+                yield event
+
+        done = {"done": True, "total_pages": pages_done}
+        if known is not None:
+            # Listed pages left unfetched (pages only reachable through Next links are not counted)
+            done["pages_skipped"] = max(last_page - pages_done, 0)
+            done["quotes_skipped"] = quotes_skipped
+        yield done
+
+    except asyncio.TimeoutError:
+        logger.error("Timed out waiting for a free browser context")
+        yield {"error": "Le serveur est saturé, réessayez dans quelques instants."}
+    except Exception as e:
+        logger.error(f"Global error in scraper: {e}")
+        yield {"error": str(e)}
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+from config import (
+    BROWSER_POOL_ACQUIRE_TIMEOUT,
+    BROWSER_POOL_MAX_CONTEXTS,
+    BROWSER_POOL_RECYCLE_AFTER,
+)
+from scraper.metrics import metrics
+from scraper.page_profile import PageProfile, PageStats, profile_from_settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+class BrowserPool:
+    """
+    Keeps one long-lived Chromium and hands out isolated context/page pairs.
+
+    At most `max_contexts` pages are open at once; extra callers wait in FIFO
+    order (up to `acquire_timeout` seconds). The browser is replaced after
+    `recycle_after` pages or as soon as it disconnects; a retired browser is
+    closed once its last context is released.
+
+    The page `profile` decides what pages load: with the lean profile,
+    requests for unused resources are aborted and pages share one warmed
+    context per browser (its cookies are carried over to the next browser);
+    the full profile gives every page a fresh context that loads everything.
+    Bytes, requests and time per page are tracked for the active profile.
+    """
+
+    def __init__(
+        self,
+        max_contexts: int = BROWSER_POOL_MAX_CONTEXTS,
+        recycle_after: int = BROWSER_POOL_RECYCLE_AFTER,
+        acquire_timeout: float = BROWSER_POOL_ACQUIRE_TIMEOUT,
+        headless: bool = True,
+        user_agent: str = USER_AGENT,
+        profile: PageProfile | None = None,
+    ):
+        self.max_contexts = max_contexts
+        self.recycle_after = recycle_after
+        self.acquire_timeout = acquire_timeout
+        self.headless = headless
+        self.user_agent = user_agent
+        self.profile = profile or profile_from_settings()
+
+        self._playwright = None
+        self._browser = None
+        self._browser_pages = 0
+        # Contexts still open per browser, so retired browsers can be closed lazily
+        self._open_contexts: dict = {}
+        # Lean profile: the warmed context of each browser, and cookies saved from retired ones
+        self._shared_contexts: dict = {}
+        self._storage_state: dict | None = None
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_contexts)
+
+        self._waiting = 0
+        self._active = 0
+        self._launches = 0
+        self._crashes = 0
+        self._pages_served = 0
+        self._acquired = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._page_bytes = 0
+        self._page_requests = 0
+        self._page_blocked = 0
+        self._page_time = 0.0
+
+    async def start(self):
+        """Starts Playwright and launches the first browser."""
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def close(self):
+        """Closes every browser and stops Playwright."""
+        async with self._lock:
+            self._browser = None
+            for browser in list(self._open_contexts):
+                await self._close_browser(browser)
+            self._open_contexts.clear()
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def _ensure_browser(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        browser = self._browser
+        if browser and browser.is_connected() and self._browser_pages < self.recycle_after:
+            return browser
+
+        if browser:
+            self._browser = None
+            if not browser.is_connected():
+                logger.warning("Browser disconnected, launching a new one")
+                self._open_contexts.pop(browser, None)
+            else:
+                logger.info(f"Recycling browser after {self._browser_pages} pages")
+                await self._retire(browser)
+
+        with metrics.span("browser_launch"):
+            browser = await self._playwright.chromium.launch(headless=self.headless)
+        browser.on("disconnected", self._on_disconnected)
+        self._browser = browser
+        self._browser_pages = 0
+        self._open_contexts[browser] = 0
+        self._launches += 1
+        return browser
+
+    def _on_disconnected(self, browser):
+        if browser is self._browser:
+            self._crashes += 1
+            self._browser = None
+        self._open_contexts.pop(browser, None)
+        self._shared_contexts.pop(browser, None)
+
+    async def _retire(self, browser):
+        if self._open_contexts.get(browser, 0) == 0:
+            await self._close_browser(browser)
+
+    async def _close_browser(self, browser):
+        self._open_contexts.pop(browser, None)
+        context = self._shared_contexts.pop(browser, None)
+        if context is not None:
+            try:
+                self._storage_state = await context.storage_state()
+            except Exception as e:
+                logger.warning(f"Could not save browser cookies: {e}")
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {e}")
+
+    def _new_context(self, browser):
+        options = {"user_agent": self.user_agent, "java_script_enabled": self.profile.javascript}
+        if self.profile.shared_context and self._storage_state:
+            options["storage_state"] = self._storage_state
+        return browser.new_context(**options)
+
+    async def _shared_context(self, browser):
+        """Warmed context of `browser`, created on first use. Call with the lock held."""
+        context = self._shared_contexts.get(browser)
+        if context is None:
+            context = await self._new_context(browser)
+            self._shared_contexts[browser] = context
+        return context
+
+    async def _route(self, route, stats: PageStats):
+        request = route.request
+        if self.profile.allows(request.url, request.resource_type):
+            await route.continue_()
+        else:
+            stats.blocked += 1
+            await route.abort()
+
+    async def _open_page(self, context, stats: PageStats):
+        page = await context.new_page()
+        page.on("response", stats.on_response)
+        if self.profile.intercepts:
+            await page.route("**/*", lambda route: self._route(route, stats))
+        return page
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Yields a fresh page in its own browser context.
+        Raises asyncio.TimeoutError if no slot frees up within `acquire_timeout`.
+        """
+        started = time.perf_counter()
+        self._waiting += 1
+        acquired = False
+        try:
+            async with asyncio.timeout(self.acquire_timeout):
+                await self._semaphore.acquire()
+                acquired = True
+        except BaseException:
+            # Timed out or cancelled right after the permit was granted: give it back
+            if acquired:
+                self._semaphore.release()
+            raise
+        finally:
+            self._waiting -= 1
+
+        waited = time.perf_counter() - started
+        self._acquired += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        metrics.observe("pool_wait", waited)
+
+        context = None
+        page = None
+        browser = None
+        shared = self.profile.shared_context
+        try:
+            async with self._lock:
+                browser = await self._ensure_browser()
+                self._browser_pages += 1
+                self._open_contexts[browser] = self._open_contexts.get(browser, 0) + 1
+                if shared:
+                    context = await self._shared_context(browser)
+
+            if not shared:
+                context = await self._new_context(browser)
+            stats = PageStats()
+            page = await self._open_page(context, stats)
+            self._active += 1
+            used = time.perf_counter()
+            try:
+                yield page
+            finally:
+                self._active -= 1
+                self._pages_served += 1
+                self._page_time += time.perf_counter() - used
+                self._page_bytes += stats.bytes
+                self._page_requests += stats.requests
+                self._page_blocked += stats.blocked
+        finally:
+            # A shared context stays open for the next pages; only the page goes
+            closing = page if shared else context
+            if closing is not None:
+                try:
+                    await closing.close()
+                except Exception as e:
+                    logger.warning(f"Error closing browser {'page' if shared else 'context'}: {e}")
+            if browser is not None:
+                async with self._lock:
+                    if browser in self._open_contexts:
+                        self._open_contexts[browser] -= 1
+                        if browser is not self._browser:
+                            await self._retire(browser)
+            self._semaphore.release()
+
+    def metrics(self) -> dict:
+        """Snapshot of pool usage, exposed by the API."""
+        return {
+            "max_contexts": self.max_contexts,
+            "active_contexts": self._active,
+            "waiting": self._waiting,
+            "browsers_open": len(self._open_contexts),
+            "browser_launches": self._launches,
+            "browser_crashes": self._crashes,
+            "pages_served": self._pages_served,
+            "wait_avg_ms": round(1000 * self._wait_total / self._acquired, 2) if self._acquired else 0.0,
+            "wait_max_ms": round(1000 * self._wait_max, 2),
+            "profile": self.profile.name,
+            **self.page_metrics(),
+        }
+
+    def page_metrics(self) -> dict:
+        """Averages per page served, to compare the lean and full profiles."""
+        pages = self._pages_served
+        if not pages:
+            return {"page_kb_avg": 0.0, "page_requests_avg": 0.0, "page_blocked_avg": 0.0, "page_ms_avg": 0.0}
+        return {
+            "page_kb_avg": round(self._page_bytes / pages / 1024, 1),
+            "page_requests_avg": round(self._page_requests / pages, 1),
+            "page_blocked_avg": round(self._page_blocked / pages, 1),
+            "page_ms_avg": round(1000 * self._page_time / pages, 1),
+        }
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,55 @@
+from dataclasses import dataclass, field
+
+from config import SCRAPER_THROTTLE_BACKOFF
+
+
+class EngineFallback(Exception):
+    """Raised by an engine that cannot serve a page (bot detection, no quotes...).
+    The scraper then retries the page with the next engine. `retry_after`
+    (seconds) is set when the site asked to slow down: the host limiter then
+    holds every request to that host for that long. Such failures, and other
+    `transient` ones (a timeout cut short by its adaptive value), are first
+    retried with the same engine. `empty` means the page loaded but holds no
+    quotes: past page 1, that is the end of the topic, not a failure."""
+
+    def __init__(self, message: str = "", retry_after: float | None = None, transient: bool = False, empty: bool = False):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.transient = transient or retry_after is not None
+        self.empty = empty and not self.transient
+
+
+def retry_after_seconds(value: str | None, default: float = SCRAPER_THROTTLE_BACKOFF, cap: float = 60.0) -> float:
+    """Delay of a Retry-After header given in seconds (HTTP dates get `default`)."""
+    try:
+        return min(max(float(value), 0.0), cap)
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass
+class PageResult:
+    """Raw quote records of one topic page, as read by an engine."""
+    records: list[dict] = field(default_factory=list)
+    next_url: str | None = None
+    # Highest page number listed in the pagination, when the page shows one
+    last_page: int | None = None
+    not_found: bool = False
+
+
+class ScrapeEngine:
+    """
+    Interface of a page fetcher used by scrape_brainyquote_generator.
+    Engines only fetch and parse; events are built by the scraper so that
+    every engine streams exactly the same dicts.
+    """
+    name = "base"
+
+    async def fetch_page(self, url: str, page_number: int) -> PageResult:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    def metrics(self) -> dict:
+        return {}
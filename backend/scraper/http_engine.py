@@ -0,0 +1,141 @@
+import logging
+
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+
+from config import SCRAPER_HTTP_TIMEOUT
+from scraper.browser_pool import USER_AGENT
+from scraper.engine import EngineFallback, PageResult, ScrapeEngine, retry_after_seconds
+from scraper.metrics import metrics
+from scraper.timeouts import AdaptiveTimeout
+from scraper.utils import QUOTE_SELECTOR, absolute_url
+
+logger = logging.getLogger(__name__)
+
+# Status codes BrainyQuote / its CDN answer with when the client is throttled or challenged
+BLOCKED_STATUSES = {401, 403, 429, 503}
+BLOCKED_MARKERS = ("captcha", "access denied", "just a moment", "attention required")
+
+
+def _text(node) -> str | None:
+    if node is None:
+        return None
+    # Collapse whitespace the way innerText renders it
+    return " ".join(node.text(deep=True).split())
+
+
+def _looks_blocked(tree: LexborHTMLParser) -> bool:
+    title = tree.css_first("title")
+    title_text = (title.text() if title else "").lower()
+    return any(marker in title_text for marker in BLOCKED_MARKERS)
+
+
+def _is_not_found(tree: LexborHTMLParser) -> bool:
+    title = tree.css_first("title")
+    h1 = tree.css_first("h1")
+    return "Page Not Found" in (title.text() if title else "") or "Page Not Found" in (h1.text() if h1 else "")
+
+
+def _parse_record(node) -> dict:
+    text_el = node.css_first("a.b-qt")
+    img_el = node.css_first("img.bqphtgrid")
+    return {
+        "text": _text(text_el),
+        "author": _text(node.css_first("a.bq-aut")),
+        "href": text_el.attributes.get("href") if text_el else None,
+        "src": img_el.attributes.get("src") if img_el else None,
+        "data_src": img_el.attributes.get("data-src") if img_el else None,
+    }
+
+
+def _parse_next_url(tree: LexborHTMLParser) -> str | None:
+    next_link = tree.css_first("ul.pagination li.page-item:last-child a")
+    if next_link is None:
+        next_link = next((a for a in tree.css("a") if _text(a) == "Next"), None)
+    if next_link is None:
+        return None
+
+    parent = next_link.parent
+    if parent is not None and "disabled" in (parent.attributes.get("class") or ""):
+        return None
+
+    href = next_link.attributes.get("href")
+    if not href or href.startswith("#"):
+        return None
+    return absolute_url(href)
+
+
+def _parse_last_page(tree: LexborHTMLParser) -> int | None:
+    numbers = [int(text) for text in (_text(a) for a in tree.css("ul.pagination a")) if text and text.isdigit()]
+    return max(numbers) if numbers else None
+
+
+def parse_topic_page(html: str) -> PageResult:
+    """Parses a server-rendered topic page. Raises EngineFallback if it holds no quotes."""
+    tree = LexborHTMLParser(html)
+
+    if _is_not_found(tree):
+        return PageResult(not_found=True)
+    if _looks_blocked(tree):
+        raise EngineFallback("Bot challenge page returned")
+
+    records = [_parse_record(node) for node in tree.css(QUOTE_SELECTOR)]
+    if not records:
+        raise EngineFallback("No quotes in the server-rendered HTML", empty=True)
+
+    return PageResult(records=records, next_url=_parse_next_url(tree), last_page=_parse_last_page(tree))
+
+
+class HttpEngine(ScrapeEngine):
+    """
+    Browserless engine: plain GET through a pooled httpx.AsyncClient and
+    HTML parsing with selectolax. Costs a few MB instead of a Chromium.
+    The request timeout adapts to the measured response times, up to `timeout`.
+    """
+    name = "http"
+
+    def __init__(self, timeout: float = SCRAPER_HTTP_TIMEOUT, max_connections: int = 10):
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.request_timeout = AdaptiveTimeout(timeout)
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers={"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"},
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def fetch_page(self, url: str, page_number: int) -> PageResult:
+        cut_short = self.request_timeout.cut_short
+        try:
+            with metrics.span("http_fetch"), self.request_timeout.measure((httpx.TimeoutException,)):
+                response = await self._get_client().get(url, timeout=self.request_timeout.seconds)
+        except httpx.TimeoutException as e:
+            raise EngineFallback(f"Failed to load page: {e!r}", transient=cut_short) from e
+        except httpx.HTTPError as e:
+            raise EngineFallback(f"Failed to load page: {e}") from e
+
+        if response.status_code == 404:
+            return PageResult(not_found=True)
+        if response.status_code == 429:
+            raise EngineFallback("HTTP 429 (rate limited)", retry_after=retry_after_seconds(response.headers.get("retry-after")))
+        if response.status_code in BLOCKED_STATUSES:
+            raise EngineFallback(f"HTTP {response.status_code} (likely bot detection)")
+        if response.status_code != 200:
+            raise EngineFallback(f"Unexpected HTTP status {response.status_code}")
+
+        with metrics.span("parse"):
+            return parse_topic_page(response.text)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def metrics(self) -> dict:
+        return {"request": self.request_timeout.metrics()}
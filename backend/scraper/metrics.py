@@ -0,0 +1,191 @@
+import asyncio
+import bisect
+import time
+from contextvars import ContextVar
+
+from config import METRICS_ENABLED
+
+# Histogram buckets (seconds), from a cached selector wait to a slow browser launch
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "scraper_span_seconds": "Time spent in each instrumented step of a scrape",
+    "scraper_span_errors_total": "Instrumented steps that raised",
+    "scraper_pages_total": "Page fetches per engine and outcome",
+}
+
+
+class Trace:
+    """Span totals of one scrape, sent to its client as a summary event."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: dict[str, list] = {}  # name -> [count, total, max]
+
+    def add(self, name: str, seconds: float):
+        span = self.spans.get(name)
+        if span is None:
+            self.spans[name] = [1, seconds, seconds]
+        else:
+            span[0] += 1
+            span[1] += seconds
+            span[2] = max(span[2], seconds)
+
+    def summary(self) -> dict:
+        return {
+            "wall_ms": round(1000 * (time.perf_counter() - self.started), 1),
+            "spans": {
+                name: {"count": count, "total_ms": round(1000 * total, 1), "max_ms": round(1000 * longest, 1)}
+                for name, (count, total, longest) in sorted(self.spans.items(), key=lambda item: -item[1][1])
+            },
+        }
+
+
+_trace: ContextVar[Trace | None] = ContextVar("scrape_trace", default=None)
+
+
+def start_trace() -> Trace:
+    """
+    Collects the spans of the current task, and of the tasks it creates from
+    now on, into a new Trace. Spans running in tasks shared with other
+    scrapes (browser launch, periodic quote flush...) are not included.
+    """
+    trace = Trace()
+    _trace.set(trace)
+    return trace
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size  # per bucket, not cumulative; the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        failed = exc_type is not None and not issubclass(exc_type, asyncio.CancelledError)
+        self.metrics.observe(self.name, time.perf_counter() - self.started, failed)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Metrics:
+    """
+    In-process timing histograms and counters, rendered in the Prometheus
+    text format by `render`.
+
+    `with metrics.span("page_goto"):` times a step; spans also feed the
+    Trace of the current scrape, if any. When disabled, and outside a
+    trace, a span is a shared no-op object and counters are ignored.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, buckets: tuple[float, ...] = BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms: dict[str, _Histogram] = {}
+        self._errors: dict[str, int] = {}
+        self._counters: dict[tuple, float] = {}
+
+    def span(self, name: str):
+        if not self.enabled and _trace.get() is None:
+            return _NO_SPAN
+        return _Span(self, name)
+
+    def observe(self, name: str, seconds: float, failed: bool = False):
+        trace = _trace.get()
+        if trace is not None:
+            trace.add(name, seconds)
+        if not self.enabled:
+            return
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = _Histogram(len(self.buckets) + 1)
+        histogram.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        histogram.sum += seconds
+        histogram.count += 1
+        if failed:
+            self._errors[name] = self._errors.get(name, 0) + 1
+
+    def count(self, name: str, value: float = 1, **labels: str):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def render(self) -> str:
+        lines = []
+        if self._histograms:
+            lines += _header("scraper_span_seconds", "histogram")
+            for name, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f'scraper_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'scraper_span_seconds_sum{{span="{name}"}} {histogram.sum:.6f}')
+                lines.append(f'scraper_span_seconds_count{{span="{name}"}} {histogram.count}')
+        if self._errors:
+            lines += _header("scraper_span_errors_total", "counter")
+            lines += [f'scraper_span_errors_total{{span="{name}"}} {count}' for name, count in sorted(self._errors.items())]
+
+        by_name: dict[str, list] = {}
+        for (name, labels), value in sorted(self._counters.items()):
+            by_name.setdefault(name, []).append(f"{name}{_labels(labels)} {value:g}")
+        for name, samples in by_name.items():
+            lines += _header(name, "counter") + samples
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _header(name: str, kind: str) -> list[str]:
+    help_text = HELP.get(name)
+    return ([f"# HELP {name} {help_text}"] if help_text else []) + [f"# TYPE {name} {kind}"]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def render_gauges(component: str, values: dict) -> str:
+    """Numeric entries of a metrics() snapshot as scraper_{component}_{key} gauges."""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            value = int(value)
+        if not isinstance(value, (int, float)):
+            continue
+        name = f"scraper_{component}_{key}"
+        lines += [f"# TYPE {name} gauge", f"{name} {value:g}"]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+metrics = Metrics()
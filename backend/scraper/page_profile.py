@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from config import (
+    BRAINYQUOTE_BASE_URL,
+    BROWSER_ALLOWED_HOSTS,
+    BROWSER_BLOCKED_RESOURCES,
+    BROWSER_LEAN_JAVASCRIPT,
+    BROWSER_PROFILE,
+)
+
+
+@dataclass(frozen=True)
+class PageProfile:
+    """
+    How much of a page the browser loads.
+
+    "full" loads everything, like a regular visit. "lean" aborts requests
+    for `blocked_resources` types (images, fonts, CSS...) and for hosts
+    outside `allowed_hosts` (ads, trackers), can disable page JavaScript,
+    and reuses one warmed context per browser so cookies carry over.
+    We only read DOM attributes, so none of that is needed to extract quotes.
+    """
+    name: str
+    blocked_resources: frozenset[str] = frozenset()
+    # Hosts (and their subdomains) pages may load from; empty = any host
+    allowed_hosts: tuple[str, ...] = ()
+    javascript: bool = True
+    shared_context: bool = False
+
+    @property
+    def intercepts(self) -> bool:
+        return bool(self.blocked_resources or self.allowed_hosts)
+
+    def allows(self, url: str, resource_type: str) -> bool:
+        if resource_type in self.blocked_resources:
+            return False
+        if not self.allowed_hosts:
+            return True
+        host = urlsplit(url).hostname or ""
+        return any(host == allowed or host.endswith("." + allowed) for allowed in self.allowed_hosts)
+
+
+FULL_PROFILE = PageProfile(name="full")
+
+
+def lean_profile(
+    blocked_resources=BROWSER_BLOCKED_RESOURCES,
+    allowed_hosts=BROWSER_ALLOWED_HOSTS,
+    javascript: bool = BROWSER_LEAN_JAVASCRIPT,
+) -> PageProfile:
+    # The scraped site itself is always allowed, with its subdomains (static., cdn....)
+    site = urlsplit(BRAINYQUOTE_BASE_URL).hostname
+    if site and site.startswith("www."):
+        site = site[len("www."):]
+    hosts = tuple(dict.fromkeys([site, *allowed_hosts])) if site else tuple(allowed_hosts)
+    return PageProfile(
+        name="lean",
+        blocked_resources=frozenset(blocked_resources),
+        allowed_hosts=hosts,
+        javascript=javascript,
+        shared_context=True,
+    )
+
+
+def profile_from_settings(name: str = BROWSER_PROFILE) -> PageProfile:
+    return lean_profile() if name == "lean" else FULL_PROFILE
+
+
+class PageStats:
+    """
+    Requests of one page: responses received, their size (from Content-Length,
+    so chunked responses are not counted) and requests aborted by the profile.
+    """
+
+    def __init__(self):
+        self.bytes = 0
+        self.requests = 0
+        self.blocked = 0
+
+    def on_response(self, response):
+        self.requests += 1
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.bytes += int(length)
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import os
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from config import SCRAPER_DEBUG_DIR, SCRAPER_GOTO_TIMEOUT, SCRAPER_SELECTOR_TIMEOUT
+from scraper.browser_pool import BrowserPool, browser_pool
+from scraper.engine import EngineFallback, PageResult, ScrapeEngine, retry_after_seconds
+from scraper.metrics import metrics
+from scraper.timeouts import AdaptiveTimeout
+from scraper.utils import QUOTE_SELECTOR
+
+logger = logging.getLogger(__name__)
+
+# Title and first heading, to spot the site's "Page Not Found" page (served with a 200)
+PAGE_HEADINGS_JS = """
+() => [document.title, document.querySelector("h1") ? document.querySelector("h1").innerText : ""]
+"""
+
+# Reads every quote record of the page in a single CDP round-trip
+EXTRACT_QUOTES_JS = """
+(selector) => Array.from(document.querySelectorAll(selector)).map(el => {
+    const textEl = el.querySelector("a.b-qt");
+    const authorEl = el.querySelector("a.bq-aut");
+    const imgEl = el.querySelector("img.bqphtgrid");
+    return {
+        text: textEl ? textEl.innerText : null,
+        author: authorEl ? authorEl.innerText : null,
+        href: textEl ? textEl.getAttribute("href") : null,
+        src: imgEl ? imgEl.getAttribute("src") : null,
+        data_src: imgEl ? imgEl.getAttribute("data-src") : null,
+    };
+})
+"""
+
+# "Next" link of ul.pagination (or any link labelled Next), unless disabled
+NEXT_URL_JS = """
+() => {
+    let link = document.querySelector("ul.pagination li.page-item:last-child a");
+    if (!link) {
+        link = Array.from(document.querySelectorAll("a")).find(a => a.innerText.trim() === "Next");
+    }
+    if (!link) return null;
+    const parent = link.parentElement;
+    if (parent && parent.className.includes("disabled")) return null;
+    const href = link.getAttribute("href");
+    if (!href || href.startsWith("#")) return null;
+    return link.href;
+}
+"""
+
+# Highest page number listed in ul.pagination
+LAST_PAGE_JS = """
+() => {
+    const numbers = Array.from(document.querySelectorAll("ul.pagination a"))
+        .map(a => a.innerText.trim())
+        .filter(text => /^\\d+$/.test(text))
+        .map(Number);
+    return numbers.length ? Math.max(...numbers) : null;
+}
+"""
+
+async def _extract_batch(page) -> list[dict] | None:
+    """Returns all quote records of the page, or None if the in-page script failed."""
+    try:
+        return await page.evaluate(EXTRACT_QUOTES_JS, QUOTE_SELECTOR)
+    except Exception as e:
+        logger.warning(f"Batch extraction failed, falling back to per-element extraction: {e}")
+        return None
+
+async def _extract_element(el, idx: int, page_number: int) -> dict | None:
+    """Reads one quote record element by element (one CDP round-trip per call)."""
+    try:
+        text_el = await el.query_selector("a.b-qt")
+        author_el = await el.query_selector("a.bq-aut")
+        if not text_el or not author_el:
+            return None
+
+        record = {
+            "text": await text_el.inner_text(),
+            "author": await author_el.inner_text(),
+            "href": await text_el.get_attribute("href"),
+            "src": None,
+            "data_src": None,
+        }
+
+        img_el = await el.query_selector("img.bqphtgrid")
+        if img_el:
+            record["src"] = await img_el.get_attribute("src")
+            if not record["src"] or "base64" in record["src"]:
+                record["data_src"] = await img_el.get_attribute("data-src")
+        return record
+    except Exception as item_error:
+        logger.error(f"Error scraping item {idx} on page {page_number}: {item_error}")
+        return None
+
+# Debug artifacts being written, kept referenced until done
+_artifact_tasks: set[asyncio.Task] = set()
+
+def _write_artifacts(directory: str, name: str, html: str, screenshot: bytes | None):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{name}.html"), "w", encoding="utf-8") as f:
+        f.write(html)
+    if screenshot:
+        with open(os.path.join(directory, f"{name}.png"), "wb") as f:
+            f.write(screenshot)
+
+async def _capture_artifacts(page, directory: str, name: str):
+    """Grabs the page HTML and a screenshot; files are written in the background."""
+    try:
+        html = await page.content()
+        screenshot = await page.screenshot(timeout=5000)
+    except Exception as e:
+        logger.warning(f"Could not capture debug artifacts: {e}")
+        return
+    task = asyncio.create_task(asyncio.to_thread(_write_artifacts, directory, name, html, screenshot))
+    _artifact_tasks.add(task)
+    task.add_done_callback(_artifact_tasks.discard)
+    logger.info(f"Saving debug artifacts to {os.path.join(directory, name)}.(html|png)")
+
+
+class PlaywrightEngine(ScrapeEngine):
+    """
+    Full headless Chromium engine, used when the HTTP engine is blocked or
+    gets no quotes. extract_mode: "batch" reads a whole page in one evaluate
+    call, "element" queries each quote element separately (slower fallback).
+
+    Page load and quote waits use adaptive timeouts (AdaptiveTimeout, capped
+    by `goto_timeout` / `selector_timeout` seconds), and 404/429 answers end
+    the page before any DOM wait. With a `debug_dir`, the HTML and a
+    screenshot of a first page without quotes are saved there.
+    """
+    name = "playwright"
+
+    def __init__(
+        self,
+        pool: BrowserPool = browser_pool,
+        extract_mode: str = "batch",
+        goto_timeout: float = SCRAPER_GOTO_TIMEOUT,
+        selector_timeout: float = SCRAPER_SELECTOR_TIMEOUT,
+        debug_dir: str = SCRAPER_DEBUG_DIR,
+    ):
+        self.pool = pool
+        self.extract_mode = extract_mode
+        self.goto_timeout = AdaptiveTimeout(goto_timeout)
+        self.selector_timeout = AdaptiveTimeout(selector_timeout)
+        self.debug_dir = debug_dir
+
+    async def fetch_page(self, url: str, page_number: int) -> PageResult:
+        async with self.pool.page() as page:
+            cut_short = self.goto_timeout.cut_short
+            try:
+                with metrics.span("page_goto"), self.goto_timeout.measure((PlaywrightTimeoutError,)):
+                    response = await page.goto(url, timeout=self.goto_timeout.ms, wait_until="domcontentloaded")
+            except Exception as e:
+                logger.error(f"Failed to load page: {e}")
+                transient = cut_short and isinstance(e, PlaywrightTimeoutError)
+                raise EngineFallback(f"Failed to load page: {str(e)}", transient=transient) from e
+
+            # Invalid topic or throttling: known from the status, no need to wait for the DOM
+            status = response.status if response is not None else None
+            if status == 404:
+                return PageResult(not_found=True)
+            if status == 429:
+                raise EngineFallback("HTTP 429 (rate limited)", retry_after=retry_after_seconds(response.headers.get("retry-after")))
+
+            # Check for "Page Not Found" (invalid topic)
+            try:
+                title, h1_text = await page.evaluate(PAGE_HEADINGS_JS)
+                if "Page Not Found" in title or "Page Not Found" in h1_text:
+                    return PageResult(not_found=True)
+            except Exception as e:
+                logger.warning(f"Error checking 404 state: {e}")
+
+            # Wait for grid items to appear (usually already there once the DOM is loaded)
+            cut_short = self.selector_timeout.cut_short
+            try:
+                with metrics.span("selector_wait"), self.selector_timeout.measure((PlaywrightTimeoutError,)):
+                    await page.wait_for_selector(QUOTE_SELECTOR, timeout=self.selector_timeout.ms)
+            except Exception as e:
+                logger.warning(f"No quotes found on page {page_number} (selector timed out): {e}")
+                if page_number == 1 and self.debug_dir:
+                    slug = url.rstrip("/").rsplit("/", 1)[-1]
+                    await _capture_artifacts(page, self.debug_dir, f"debug_{slug}_p{page_number}")
+                transient = cut_short and isinstance(e, PlaywrightTimeoutError)
+                raise EngineFallback(
+                    "No quotes found. The site might be blocking the scraper.",
+                    transient=transient,
+                    empty=isinstance(e, PlaywrightTimeoutError),
+                ) from e
+
+            with metrics.span("extract"):
+                records = None
+                if self.extract_mode == "batch":
+                    records = await _extract_batch(page)
+                if records is None:
+                    quote_elements = await page.query_selector_all(QUOTE_SELECTOR)
+                    records = []
+                    for idx, el in enumerate(quote_elements, start=1):
+                        with metrics.span("extract_item"):
+                            records.append(await _extract_element(el, idx, page_number))
+
+            next_url = None
+            last_page = None
+            try:
+                with metrics.span("pagination"):
+                    next_url = await page.evaluate(NEXT_URL_JS)
+                    last_page = await page.evaluate(LAST_PAGE_JS)
+            except Exception as e:
+                logger.warning(f"Error during pagination check: {e}")
+
+            return PageResult(records=records, next_url=next_url, last_page=last_page)
+
+    def metrics(self) -> dict:
+        return {"goto": self.goto_timeout.metrics(), "selector": self.selector_timeout.metrics()}
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from config import BRAINYQUOTE_BASE_URL, SCRAPER_HOST_BURST, SCRAPER_HOST_CONCURRENCY, SCRAPER_HOST_RATE
+from scraper.metrics import metrics
+
+
+class TokenBucket:
+    """
+    Politeness limiter: allows `rate` acquisitions per second on average,
+    with bursts of up to `capacity`. A rate <= 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Holds every acquisition for `seconds` (the host asked to slow down)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        if self.rate <= 0 and self._paused_until <= time.monotonic():
+            return
+
+        # The lock keeps waiters in FIFO order
+        async with self._lock:
+            while (delay := self._paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+                # No burst of tokens saved up during the pause
+                self._tokens = min(self._tokens, 1.0)
+                self._updated = time.monotonic()
+            if self.rate <= 0:
+                return
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class SharedTokenBucket:
+    """
+    TokenBucket whose state (tokens, last refill, end of pause) lives in
+    shared memory, so that several processes draw on one budget and all
+    honour a pause requested by the site. The lock of the shared array is
+    only held to update it, never while waiting.
+    """
+
+    def __init__(self, rate: float, capacity: float, state):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._state = state
+        # Keeps this process's waiters in FIFO order
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def new_state(context, capacity: float):
+        """Shared array for the bucket, from a multiprocessing context."""
+        return context.Array("d", [max(capacity, 1.0), time.monotonic(), 0.0])
+
+    def pause(self, seconds: float):
+        with self._state.get_lock():
+            self._state[2] = max(self._state[2], time.monotonic() + seconds)
+
+    def _take(self) -> float:
+        """Takes a token if one is available; otherwise returns how long to wait."""
+        with self._state.get_lock():
+            tokens, updated, paused_until = self._state[:]
+            now = time.monotonic()
+            if paused_until > now:
+                # No burst of tokens saved up during the pause
+                self._state[0], self._state[1] = min(tokens, 1.0), paused_until
+                return paused_until - now
+            if self.rate <= 0:
+                return 0.0
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._state[0], self._state[1] = tokens - 1, now
+                return 0.0
+            self._state[0], self._state[1] = tokens, now
+            return (1 - tokens) / self.rate
+
+    async def acquire(self):
+        async with self._lock:
+            while (delay := self._take()) > 0:
+                await asyncio.sleep(delay)
+
+
+class HostLimiter:
+    """
+    Bounds concurrent requests and request rate per host, shared by all
+    scrapes of the process. The rate budgets of `shared_hosts` can also be
+    shared with other processes (job workers): `share` moves them to shared
+    memory, and the other processes `attach` to them.
+    """
+
+    def __init__(self, concurrency: int, rate: float, burst: float, shared_hosts: tuple[str, ...] = ()):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.shared_hosts = shared_hosts
+        self._hosts: dict[str, tuple[asyncio.Semaphore, TokenBucket | SharedTokenBucket]] = {}
+
+    def _slot(self, host: str) -> tuple[asyncio.Semaphore, TokenBucket]:
+        if host not in self._hosts:
+            self._hosts[host] = (asyncio.Semaphore(self.concurrency), TokenBucket(self.rate, self.burst))
+        return self._hosts[host]
+
+    def share(self, context) -> dict:
+        """Shared budgets of `shared_hosts`, now used by this process too; pass them to attach() elsewhere."""
+        budgets = {host: SharedTokenBucket.new_state(context, self.burst) for host in self.shared_hosts}
+        self.attach(budgets)
+        return budgets
+
+    def attach(self, budgets: dict):
+        for host, state in budgets.items():
+            semaphore = self._hosts[host][0] if host in self._hosts else asyncio.Semaphore(self.concurrency)
+            self._hosts[host] = (semaphore, SharedTokenBucket(self.rate, self.burst, state))
+
+    def pause(self, url: str, seconds: float):
+        self._slot(urlsplit(url).netloc)[1].pause(seconds)
+
+    @asynccontextmanager
+    async def limit(self, url: str):
+        semaphore, bucket = self._slot(urlsplit(url).netloc)
+        started = time.perf_counter()
+        async with semaphore:
+            await bucket.acquire()
+            metrics.observe("host_wait", time.perf_counter() - started)
+            yield
+
+
+# The scraped site's rate budget is shared with the job worker processes (JobManager calls share())
+host_limiter = HostLimiter(
+    SCRAPER_HOST_CONCURRENCY, SCRAPER_HOST_RATE, SCRAPER_HOST_BURST, shared_hosts=(urlsplit(BRAINYQUOTE_BASE_URL).netloc,)
+)
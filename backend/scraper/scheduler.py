@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from collections import deque
+
+from config import SCRAPER_BATCH_CONCURRENCY, SCRAPER_BATCH_PAGE_BUDGET
+from scraper.engine import PageResult
+
+logger = logging.getLogger(__name__)
+
+BUDGET_EXHAUSTED = "Budget de pages épuisé pour ce lot."
+
+
+class PageScheduler:
+    """
+    Fetches the pages of many topic scrapes through one set of workers.
+
+    Each topic has its own queue of page requests and the workers serve the
+    topics round-robin, so a topic with 20 pages queued does not hold back
+    the first page of the others. At most `concurrency` pages are in flight
+    and `page_budget` pages are fetched in total (0 = no budget); requests
+    past the budget resolve to (None, BUDGET_EXHAUSTED). The per-host limit
+    still applies, through each scrape's engine chain.
+    """
+
+    def __init__(self, concurrency: int = SCRAPER_BATCH_CONCURRENCY, page_budget: int = SCRAPER_BATCH_PAGE_BUDGET):
+        self.concurrency = max(concurrency, 1)
+        self.page_budget = page_budget
+        self.pages_fetched = 0
+
+        self._queues: dict[str, deque] = {}
+        self._turns: deque[str] = deque()  # topics with queued requests, in serving order
+        self._ready = asyncio.Condition()
+        self._workers: list[asyncio.Task] = []
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # Release anything still waiting
+        for queue in self._queues.values():
+            for future, _ in queue:
+                if not future.done():
+                    future.cancel()
+        self._queues.clear()
+        self._turns.clear()
+
+    @property
+    def budget_left(self) -> int | None:
+        if self.page_budget <= 0:
+            return None
+        return max(self.page_budget - self.pages_fetched, 0)
+
+    async def fetch(self, topic: str, chain, url: str, page_number: int) -> tuple[PageResult | None, str | None]:
+        """Queues a page of `topic`, fetched with `chain` (an _EngineChain) when its turn comes."""
+        if self.budget_left == 0:
+            return None, BUDGET_EXHAUSTED
+
+        future = asyncio.get_running_loop().create_future()
+        async with self._ready:
+            queue = self._queues.setdefault(topic, deque())
+            if not queue:
+                self._turns.append(topic)
+            queue.append((future, lambda: chain.fetch(url, page_number)))
+            self._ready.notify()
+        return await future
+
+    async def _next(self):
+        """Waits for the next request, taking one from each topic in turn."""
+        async with self._ready:
+            while True:
+                while self._turns:
+                    topic = self._turns.popleft()
+                    queue = self._queues[topic]
+                    future, fetch = queue.popleft()
+                    if queue:
+                        self._turns.append(topic)
+                    else:
+                        del self._queues[topic]
+                    # Requester gone (scrape stopped or cancelled its page tasks)
+                    if not future.done():
+                        return future, fetch
+                await self._ready.wait()
+
+    async def _worker(self):
+        while True:
+            future, fetch = await self._next()
+            if self.budget_left == 0:
+                future.set_result((None, BUDGET_EXHAUSTED))
+                continue
+
+            self.pages_fetched += 1
+            try:
+                result = await fetch()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(result)
+
+    def metrics(self) -> dict:
+        return {
+            "pages_fetched": self.pages_fetched,
+            "page_budget": self.page_budget,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "topics_waiting": len(self._turns),
+        }
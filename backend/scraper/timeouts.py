@@ -0,0 +1,76 @@
+import time
+from contextlib import contextmanager
+
+from config import SCRAPER_TIMEOUT_FLOOR
+
+
+class AdaptiveTimeout:
+    """
+    Timeout of a recurring wait (page load, selector, HTTP request), derived
+    from the durations of the previous successful ones the way TCP sets its
+    retransmission timeout: EWMA mean + 4 x EWMA deviation, kept between
+    `floor` and `ceiling`. The ceiling applies until `warmup` durations were
+    measured. Each expiry doubles the timeout (up to the ceiling) until the
+    next success, so a slower site quickly gets more room again.
+    """
+
+    def __init__(self, ceiling: float, floor: float = SCRAPER_TIMEOUT_FLOOR, warmup: int = 3):
+        self.ceiling = ceiling
+        self.floor = min(floor, ceiling)
+        self.warmup = warmup
+        self._mean = 0.0
+        self._deviation = 0.0
+        self._samples = 0
+        self._expired = 0
+        self._backoff = 1
+
+    @property
+    def seconds(self) -> float:
+        if self._samples < self.warmup:
+            return self.ceiling
+        return min(max(self._mean + 4 * self._deviation, self.floor) * self._backoff, self.ceiling)
+
+    @property
+    def cut_short(self) -> bool:
+        """Whether the current timeout is below the ceiling: expiring then may only mean it was too tight."""
+        return self.seconds < self.ceiling
+
+    @property
+    def ms(self) -> float:
+        """Same, in milliseconds (Playwright timeouts)."""
+        return 1000 * self.seconds
+
+    def observe(self, seconds: float):
+        if self._samples == 0:
+            self._mean, self._deviation = seconds, seconds / 2
+        else:
+            # RFC 6298 gains: 1/4 for the deviation, 1/8 for the mean
+            self._deviation += (abs(seconds - self._mean) - self._deviation) / 4
+            self._mean += (seconds - self._mean) / 8
+        self._samples += 1
+        self._backoff = 1
+
+    def expired(self):
+        self._expired += 1
+        if self._samples >= self.warmup and self.seconds < self.ceiling:
+            self._backoff *= 2
+
+    @contextmanager
+    def measure(self, timeout_errors: tuple[type[BaseException], ...]):
+        """Times the wait in the block: its duration on success, expired() on one of `timeout_errors`."""
+        started = time.perf_counter()
+        try:
+            yield
+        except timeout_errors:
+            self.expired()
+            raise
+        self.observe(time.perf_counter() - started)
+
+    def metrics(self) -> dict:
+        return {
+            "timeout_ms": round(self.ms),
+            "mean_ms": round(1000 * self._mean, 1),
+            "samples": self._samples,
+            "expired": self._expired,
+            "backoff": self._backoff,
+        }
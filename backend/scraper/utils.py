@@ -0,0 +1,74 @@
+import hashlib
+import re
+
+from config import BRAINYQUOTE_BASE_URL
+
+BASE_URL = BRAINYQUOTE_BASE_URL
+
+# Only actual quote items (ads are plain .grid-item)
+QUOTE_SELECTOR = ".grid-item.bqQt"
+
+
+def normalize_topic(topic: str) -> str:
+    """URL slug of a topic: "Self Love " -> "self-love"."""
+    return topic.strip().lower().replace(" ", "-")
+
+
+def topic_pattern(topic: str) -> str:
+    """
+    Case-insensitive regex (PostgreSQL ~*, Python re.I) matching every
+    spelling that normalize_topic maps to the same slug as `topic`:
+    "self-love" matches "Self Love", "self-love " and "SELF-LOVE".
+    """
+    parts = [re.escape(part) for part in normalize_topic(topic).split("-")]
+    return r"^\s*" + "[- ]".join(parts) + r"\s*$"
+
+
+def topic_page_url(topic: str, page_number: int = 1) -> str:
+    """Topic pages follow the pattern {topic}-quotes, {topic}-quotes_2, ..."""
+    url = f"{BASE_URL}/topics/{topic}-quotes"
+    return url if page_number == 1 else f"{url}_{page_number}"
+
+
+def absolute_url(path: str | None) -> str | None:
+    """Prefixes site-relative paths with the BrainyQuote origin."""
+    if path and path.startswith("/"):
+        return BASE_URL + path
+    return path
+
+
+def pick_image_src(src: str | None, data_src: str | None) -> str | None:
+    """Lazy-loaded images keep a base64 placeholder in src and the real URL in data-src."""
+    if (not src or "base64" in src) and data_src:
+        src = data_src
+    return absolute_url(src)
+
+
+def build_quote(record: dict | None) -> dict | None:
+    """
+    Turns a raw record {text, author, href, src, data_src} read from the page
+    into the quote fields sent to the client, or None if text/author is missing.
+    """
+    if not record or not record.get("text") or not record.get("author"):
+        return None
+
+    return {
+        "text": record["text"].strip(),
+        "author": record["author"].strip(),
+        "link": BASE_URL + (record.get("href") or ""),
+        "image_url": pick_image_src(record.get("src"), record.get("data_src")),
+    }
+
+
+def quote_key(quote: dict) -> str | None:
+    """
+    Identity of a quote across scrapes: its link, or a hash of its text
+    when it has no link of its own (incremental re-scrapes).
+    """
+    link = quote.get("link")
+    if link and link != BASE_URL:
+        return link
+    text = (quote.get("text") or "").strip().lower()
+    if not text:
+        return None
+    return "text:" + hashlib.sha1(text.encode()).hexdigest()
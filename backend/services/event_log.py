@@ -0,0 +1,38 @@
+import asyncio
+from typing import AsyncIterator
+
+
+class EventLog:
+    """
+    Append-only list of stream events that any number of readers can tail,
+    each from its own offset (replay what exists, then wait for more).
+    append() and close() are synchronous so they can be called from callbacks.
+    """
+
+    def __init__(self):
+        self.events: list[dict] = []
+        self.closed = False
+        self._wakeup = asyncio.Event()
+
+    def _notify(self):
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
+
+    def append(self, event: dict):
+        self.events.append(event)
+        self._notify()
+
+    def close(self):
+        self.closed = True
+        self._notify()
+
+    async def follow(self, offset: int = 0) -> AsyncIterator[dict]:
+        index = max(offset, 0)
+        while True:
+            if index < len(self.events):
+                yield self.events[index]
+                index += 1
+            elif self.closed:
+                return
+            else:
+                await self._wakeup.wait()
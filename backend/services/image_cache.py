@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from config import IMAGE_CACHE_LRU_SIZE, IMAGE_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+
+def content_digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def image_object_name(digest: str, suffix: str) -> str:
+    """Stable storage path: the same bytes always land on the same object."""
+    return f"images/{digest[:2]}/{digest}.{suffix}"
+
+
+class ImageCache:
+    """
+    Content-addressed index of stored images.
+
+    Source URL -> public URL lookups hit an in-process LRU first, then a
+    SQLite index that survives restarts (source URL -> sha256 of the bytes,
+    sha256 -> public URL). A known URL skips download and upload; a new URL
+    whose bytes were already stored only skips the upload.
+    """
+
+    def __init__(self, path: str = IMAGE_CACHE_PATH, lru_size: int = IMAGE_CACHE_LRU_SIZE, busy_timeout: float = 30.0):
+        self.path = path
+        self.lru_size = lru_size
+        self.busy_timeout = busy_timeout
+        self._lru: OrderedDict[str, str] = OrderedDict()
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+
+        self._url_hits = 0
+        self._hash_hits = 0
+        self._misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Shared by the API and job worker processes: WAL lets readers run
+            # while one writes, and writers wait for each other instead of failing
+            self._db = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS images (digest TEXT PRIMARY KEY, public_url TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS sources (url TEXT PRIMARY KEY, digest TEXT NOT NULL);
+                """
+            )
+        return self._db
+
+    def _remember(self, url: str, public_url: str):
+        self._lru[url] = public_url
+        self._lru.move_to_end(url)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    # SQLite calls block: they run in worker threads, one at a time
+
+    def _select_by_url(self, url: str) -> str | None:
+        with self._db_lock:
+            row = self._connect().execute(
+                "SELECT images.public_url FROM sources JOIN images ON images.digest = sources.digest WHERE sources.url = ?",
+                (url,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _select_by_digest(self, url: str, digest: str) -> str | None:
+        with self._db_lock:
+            db = self._connect()
+            row = db.execute("SELECT public_url FROM images WHERE digest = ?", (digest,)).fetchone()
+            if row:
+                db.execute("INSERT OR REPLACE INTO sources (url, digest) VALUES (?, ?)", (url, digest))
+                db.commit()
+        return row[0] if row else None
+
+    def _insert(self, url: str, digest: str, public_url: str):
+        with self._db_lock:
+            db = self._connect()
+            db.execute("INSERT OR REPLACE INTO images (digest, public_url) VALUES (?, ?)", (digest, public_url))
+            db.execute("INSERT OR REPLACE INTO sources (url, digest) VALUES (?, ?)", (url, digest))
+            db.commit()
+
+    async def get_by_url(self, url: str) -> str | None:
+        if url in self._lru:
+            self._lru.move_to_end(url)
+            self._url_hits += 1
+            return self._lru[url]
+
+        public_url = await asyncio.to_thread(self._select_by_url, url)
+        if public_url:
+            self._remember(url, public_url)
+            self._url_hits += 1
+            return public_url
+
+        self._misses += 1
+        return None
+
+    async def get_by_digest(self, url: str, digest: str) -> str | None:
+        """Public URL of already stored bytes; records `url` as a new source of them."""
+        public_url = await asyncio.to_thread(self._select_by_digest, url, digest)
+        if public_url:
+            self._remember(url, public_url)
+            self._hash_hits += 1
+        return public_url
+
+    async def put(self, url: str, digest: str, public_url: str):
+        await asyncio.to_thread(self._insert, url, digest, public_url)
+        self._remember(url, public_url)
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def metrics(self) -> dict:
+        return {
+            "lru_entries": len(self._lru),
+            "url_hits": self._url_hits,
+            "content_hits": self._hash_hits,
+            "url_misses": self._misses,
+        }
+
+
+image_cache = ImageCache()
@@ -1,25 +1,109 @@
-import httpx
+import asyncio
+import importlib.util
 import logging
 
+import httpx
+
+from config import (
+    IMAGE_DOWNLOAD_CONCURRENCY,
+    IMAGE_DOWNLOAD_RETRIES,
+    IMAGE_HTTP_MAX_CONNECTIONS,
+    IMAGE_MAX_BYTES,
+)
+
 logger = logging.getLogger(__name__)
 
+# HTTP/2 needs the optional 'h2' package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Shared client: keep-alive connections (and HTTP/2 multiplexing) to the image CDN."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=10.0,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=IMAGE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=IMAGE_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class _RetryableStatus(Exception):
+    pass
+
+
+async def _fetch(url: str) -> tuple[bytes, str] | None:
+    async with get_client().stream("GET", url) as response:
+        if response.status_code >= 500:
+            raise _RetryableStatus(f"status {response.status_code}")
+        if response.status_code != 200:
+            logger.warning(f"Failed to download image {url}: status {response.status_code}")
+            return None
+
+        declared_size = int(response.headers.get("content-length") or 0)
+        if declared_size > IMAGE_MAX_BYTES:
+            logger.warning(f"Image {url} is too large ({declared_size} bytes), skipped")
+            return None
+
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > IMAGE_MAX_BYTES:
+                logger.warning(f"Image {url} exceeds {IMAGE_MAX_BYTES} bytes, skipped")
+                return None
+            chunks.append(chunk)
+
+        content_type = response.headers.get("content-type", "application/octet-stream")
+        return b"".join(chunks), content_type
+
+
 async def download_image(url: str) -> tuple[bytes, str] | None:
     """
     Downloads an image from a URL.
     Returns (content, content_type) or None if failed.
+    Retries with exponential backoff on 5xx responses, timeouts and connection errors.
     """
     if not url:
         return None
-        
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=10.0)
-            if response.status_code == 200:
-                content_type = response.headers.get("content-type", "application/octet-stream")
-                return response.content, content_type
-            else:
-                logger.warning(f"Failed to download image {url}: status {response.status_code}")
+
+    for attempt in range(IMAGE_DOWNLOAD_RETRIES + 1):
+        try:
+            return await _fetch(url)
+        except (_RetryableStatus, httpx.TimeoutException, httpx.TransportError) as e:
+            if attempt == IMAGE_DOWNLOAD_RETRIES:
+                logger.error(f"Error downloading image {url}: {e}")
                 return None
-    except Exception as e:
-        logger.error(f"Error downloading image {url}: {e}")
-        return None
+            delay = 0.5 * 2 ** attempt
+            logger.warning(f"Retrying image {url} in {delay:.1f}s ({e})")
+            await asyncio.sleep(delay)
+        except Exception as e:
+            logger.error(f"Error downloading image {url}: {e}")
+            return None
+
+
+async def download_images(urls: list[str], concurrency: int = IMAGE_DOWNLOAD_CONCURRENCY) -> dict[str, tuple[bytes, str] | None]:
+    """Downloads a page's images with bounded parallelism. Returns {url: result}."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(url: str):
+        async with semaphore:
+            return await download_image(url)
+
+    unique_urls = list(dict.fromkeys(url for url in urls if url))
+    results = await asyncio.gather(*(fetch_one(url) for url in unique_urls))
+    return dict(zip(unique_urls, results))
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from config import IMAGE_DOWNLOAD_WORKERS, IMAGE_UPLOAD_WORKERS, PIPELINE_QUEUE_SIZE
+from scraper.metrics import metrics
+from services.image_cache import ImageCache, content_digest, image_object_name
+from services.image_downloader import download_image
+
+logger = logging.getLogger(__name__)
+
+
+def image_suffix(mime_type: str) -> str:
+    if "png" in mime_type:
+        return "png"
+    if "webp" in mime_type:
+        return "webp"
+    return "jpg"
+
+
+class ImagePipeline:
+    """
+    Enriches scraped quotes off the streaming path:
+
+        submit() -> download workers -> upload workers (threads) -> save worker
+
+    Every stage has its own bounded queue, so a slow storage backend blocks
+    submit() (and therefore the scraper) instead of buffering without limit.
+    `emit` receives an {"image_ready": link, "image_url": ...} event as soon as
+    the stored image URL of a quote is known.
+
+    Images are stored under a hash of their bytes; with an ImageCache, known
+    source URLs skip download and upload, and known bytes skip the upload.
+
+    Quotes are tracked from submit() until `save` took them: after close(),
+    `unsaved()` returns those a cancelled run left in the queues or stages.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[dict], Awaitable[None]],
+        upload: Callable[..., str | None],
+        save: Callable[[dict], Awaitable[None]],
+        download: Callable[[str], Awaitable[tuple[bytes, str] | None]] = download_image,
+        cache: ImageCache | None = None,
+        download_workers: int = IMAGE_DOWNLOAD_WORKERS,
+        upload_workers: int = IMAGE_UPLOAD_WORKERS,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+    ):
+        self.emit = emit
+        self.download = download
+        self.upload = upload
+        self.save = save
+        self.cache = cache
+        # Source URL -> future public URL, so a repeated image is fetched once
+        self._inflight: dict[str, asyncio.Future] = {}
+        # id(quote) -> quote, from submit() until handed to `save`
+        self._unsaved: dict[int, dict] = {}
+
+        self._downloads: asyncio.Queue = asyncio.Queue(queue_size)
+        self._uploads: asyncio.Queue = asyncio.Queue(queue_size)
+        self._saves: asyncio.Queue = asyncio.Queue(queue_size)
+        self._workers = (
+            [asyncio.create_task(self._download_worker()) for _ in range(download_workers)]
+            + [asyncio.create_task(self._upload_worker()) for _ in range(upload_workers)]
+            + [asyncio.create_task(self._save_worker())]
+        )
+
+    async def submit(self, quote: dict):
+        """Queues a quote; waits while the first stage is full (backpressure)."""
+        self._unsaved[id(quote)] = quote
+        if quote.get("image_url"):
+            await self._downloads.put(quote)
+        else:
+            await self._saves.put(quote)
+
+    async def join(self):
+        """Waits until every submitted quote went through all stages, then stops the workers."""
+        await self._downloads.join()
+        await self._uploads.join()
+        await self._saves.join()
+        await self.close()
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def unsaved(self) -> list[dict]:
+        """Submitted quotes not handed to `save` yet (with their stored image URL when known)."""
+        return list(self._unsaved.values())
+
+    def _settle(self, url: str, public_url: str | None):
+        future = self._inflight.pop(url, None)
+        if future is not None and not future.done():
+            future.set_result(public_url)
+
+    async def _image_ready(self, quote: dict, public_url: str):
+        quote["image_url"] = public_url
+        await self.emit({"image_ready": quote["link"], "image_url": public_url})
+
+    async def _download_worker(self):
+        while True:
+            quote = await self._downloads.get()
+            original_image_url = quote["image_url"]
+            owner = False
+            try:
+                public_url = await self.cache.get_by_url(original_image_url) if self.cache else None
+                if public_url is None and original_image_url in self._inflight:
+                    # Same image already being fetched for another quote (same author)
+                    public_url = await asyncio.shield(self._inflight[original_image_url])
+                    if public_url is None:
+                        await self._saves.put(quote)
+                        continue
+                if public_url:
+                    await self._image_ready(quote, public_url)
+                    await self._saves.put(quote)
+                    continue
+
+                self._inflight[original_image_url] = asyncio.get_running_loop().create_future()
+                owner = True
+                logger.info(f"Downloading image from {original_image_url}...")
+                with metrics.span("image_download"):
+                    download_result = await self.download(original_image_url)
+                if download_result:
+                    await self._uploads.put((quote, original_image_url, *download_result))
+                    owner = False  # the upload worker settles it now
+                else:
+                    logger.warning("Failed to download image content")
+                    await self._saves.put(quote)
+            except Exception as img_err:
+                logger.error(f"Error processing image: {img_err}")
+                await self._saves.put(quote)
+            finally:
+                if owner:
+                    self._settle(original_image_url, None)
+                self._downloads.task_done()
+
+    async def _upload_worker(self):
+        while True:
+            quote, original_image_url, image_content, mime_type = await self._uploads.get()
+            public_url = None
+            try:
+                digest = content_digest(image_content)
+                public_url = await self.cache.get_by_digest(original_image_url, digest) if self.cache else None
+
+                if public_url is None:
+                    filename = image_object_name(digest, image_suffix(mime_type))
+                    logger.info(f"Uploading image to {filename} (Type: {mime_type})...")
+                    # Storage calls are synchronous: keep them off the event loop
+                    with metrics.span("image_upload"):
+                        public_url = await asyncio.to_thread(self.upload, image_content, filename, content_type=mime_type)
+                    if public_url and self.cache:
+                        await self.cache.put(original_image_url, digest, public_url)
+
+                if public_url:
+                    logger.info(f"Image available at {public_url}")
+                    await self._image_ready(quote, public_url)
+                else:
+                    logger.warning("Failed to upload image, keeping original URL (or None)")
+            except Exception as img_err:
+                logger.error(f"Error processing image: {img_err}")
+            finally:
+                self._settle(original_image_url, public_url)
+                await self._saves.put(quote)
+                self._uploads.task_done()
+
+    async def _save_worker(self):
+        while True:
+            quote = await self._saves.get()
+            try:
+                await self.save(quote)
+            except Exception as e:
+                logger.error(f"Error saving quote: {e}")
+            finally:
+                self._unsaved.pop(id(quote), None)
+                self._saves.task_done()
@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import multiprocessing
+import sys
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Callable
+
+from config import JOB_RETENTION, JOB_WORKERS, JOBS_PER_WORKER
+from scraper.rate_limit import host_limiter
+from scraper.utils import normalize_topic
+from services.event_log import EventLog
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    def __init__(self, topic: str):
+        self.id = uuid.uuid4().hex
+        self.topic = topic
+        self.status = "queued"
+        self.log = EventLog()
+        self.created = time.time()
+        self.finished_at: float | None = None
+        self.task: asyncio.Task | None = None
+        # pid of the worker process it was sent to
+        self.worker: int | None = None
+
+    def record(self, event: dict):
+        self.status = "running"
+        if "done" in event:
+            self.status = "done"
+        elif "error" in event:
+            self.status = "error"
+        self.log.append(event)
+
+    def finish(self):
+        if self.status in ("queued", "running"):
+            # Stream ended without a done/error event (worker stopped, shutdown)
+            self.status = "interrupted"
+        self.finished_at = time.time()
+        self.log.close()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "topic": self.topic,
+            "status": self.status,
+            "events": len(self.log.events),
+            "created": self.created,
+            "finished_at": self.finished_at,
+        }
+
+
+class _Worker:
+    """A worker process with its own task and event queues (a process killed
+    while reading or writing a shared multiprocessing queue can leave it locked)."""
+
+    def __init__(self, context, index: int, jobs_per_worker: int, budgets: dict):
+        self.tasks = context.Queue()
+        self.events = context.Queue()
+        self.jobs: set[str] = set()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(self.tasks, self.events, jobs_per_worker, budgets),
+            name=f"scrape-worker-{index}",
+            daemon=True,
+        )
+        self.collector: threading.Thread | None = None
+
+
+class JobManager:
+    """
+    Runs topic scrapes as jobs, independently of the HTTP request that created them.
+
+    With `workers` > 0 the scrapes run in that many worker processes (each
+    with its own event loop, browser pool and quote writer); a job goes to
+    the worker running the fewest jobs, and its events are collected back
+    into the job's EventLog, which clients can tail from any offset. With
+    `workers` = 0 the jobs run as tasks of the API process (`producer`
+    builds their stream). Worker processes draw on the API process's rate
+    budget for the scraped site (HostLimiter.share), so all scrapes together
+    stay within SCRAPER_HOST_RATE.
+
+    Every `check_interval` seconds, finished jobs older than `retention` are
+    dropped, and a worker process found dead (crash, OOM kill...) is
+    replaced; the jobs it was given end with an error event.
+    """
+
+    def __init__(
+        self,
+        producer: Callable[[str], AsyncIterator[dict]],
+        workers: int = JOB_WORKERS,
+        jobs_per_worker: int = JOBS_PER_WORKER,
+        retention: float = JOB_RETENTION,
+        check_interval: float = 1.0,
+    ):
+        self.producer = producer
+        self.workers = workers
+        self.jobs_per_worker = jobs_per_worker
+        self.retention = retention
+        self.check_interval = check_interval
+
+        self._jobs: dict[str, Job] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._context = None
+        self._workers: list[_Worker] = []
+        self._budgets: dict = {}
+        self._monitor: asyncio.Task | None = None
+        self._respawns = 0
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._monitor = asyncio.create_task(self._watch())
+        if self.workers <= 0:
+            return
+
+        # spawn: forking a process that runs an event loop (and Playwright) is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._budgets = host_limiter.share(self._context)
+        self._workers = [self._spawn(i) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} scrape worker processes")
+
+    def _spawn(self, index: int) -> _Worker:
+        worker = _Worker(self._context, index, self.jobs_per_worker, self._budgets)
+        worker.process.start()
+        worker.collector = threading.Thread(target=self._collect, args=(worker,), name=f"job-events-{index}", daemon=True)
+        worker.collector.start()
+        return worker
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            self._prune()
+            self._replace_dead_workers()
+
+    def _replace_dead_workers(self):
+        for index, worker in enumerate(self._workers):
+            process = worker.process
+            if process.is_alive():
+                continue
+            logger.error(f"Worker {process.name} (pid {process.pid}) died with exit code {process.exitcode}, replacing it")
+            for job_id in worker.jobs:
+                job = self._jobs.get(job_id)
+                if job is not None and job.finished_at is None:
+                    job.record({"error": f"Worker process stopped unexpectedly (exit code {process.exitcode})"})
+                    job.finish()
+            # Stops its collector thread; events still queued are dropped with it
+            worker.events.put(None)
+            self._workers[index] = self._spawn(index)
+            self._respawns += 1
+
+    async def close(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+
+        for job in self._jobs.values():
+            if job.task:
+                job.task.cancel()
+        await asyncio.gather(*(job.task for job in self._jobs.values() if job.task), return_exceptions=True)
+
+        if self._workers:
+            for worker in self._workers:
+                worker.tasks.put(None)
+            await asyncio.to_thread(self._join_processes)
+            for worker in self._workers:
+                worker.events.put(None)
+            self._workers = []
+
+    def _join_processes(self, timeout: float = 10.0):
+        for worker in self._workers:
+            process = worker.process
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Worker {process.name} did not stop, terminating it")
+                process.terminate()
+
+    def _prune(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.retention
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def submit(self, topic: str) -> Job:
+        self._prune()
+        job = Job(topic)
+        self._jobs[job.id] = job
+        if self._workers:
+            worker = min(self._workers, key=lambda w: len(w.jobs))
+            worker.jobs.add(job.id)
+            job.worker = worker.process.pid
+            worker.tasks.put((job.id, topic))
+        else:
+            job.task = asyncio.create_task(self._run_local(job))
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def running(self, topic: str) -> bool:
+        """Whether a job for `topic` (normalized) is queued or running."""
+        return any(job.finished_at is None and normalize_topic(job.topic) == topic for job in self._jobs.values())
+
+    async def _run_local(self, job: Job):
+        try:
+            async for event in self.producer(job.topic):
+                job.record(event)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            job.record({"error": f"Stream interrupted: {str(e)}"})
+        finally:
+            job.finish()
+
+    def _collect(self, worker: _Worker):
+        """Collector thread of a worker: moves its events onto the event loop."""
+        while True:
+            message = worker.events.get()
+            if message is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_event, worker, *message)
+
+    def _on_event(self, worker: _Worker, job_id: str, event: dict | None):
+        job = self._jobs.get(job_id)
+        if event is None:
+            worker.jobs.discard(job_id)
+        # Late events of a job already ended (its worker died) are dropped
+        if job is None or job.finished_at is not None:
+            return
+        if event is None:
+            job.finish()
+        else:
+            job.record(event)
+
+    def metrics(self) -> dict:
+        statuses: dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "workers": len(self._workers),
+            "workers_alive": sum(worker.process.is_alive() for worker in self._workers),
+            "workers_replaced": self._respawns,
+            "jobs": statuses,
+        }
+
+
+def _worker_main(task_queue, event_queue, jobs_per_worker: int, budgets: dict):
+    """Entry point of a worker process."""
+    logging.basicConfig(level=logging.INFO)
+    if sys.platform == "win32":
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    host_limiter.attach(budgets)
+    asyncio.run(_worker_loop(task_queue, event_queue, jobs_per_worker))
+
+
+async def _worker_loop(task_queue, event_queue, jobs_per_worker: int):
+    from scraper.brainyquote_scraper import close_engines
+    from scraper.browser_pool import browser_pool
+    from services.image_cache import image_cache
+    from services.image_downloader import close_client as close_image_client
+    from config import SCRAPER_INCREMENTAL
+    from services.quote_writer import QuoteBatchWriter
+    from services.scrape_stream import enriched_events
+    from services.seen_index import SeenIndex
+    from services.supabase_client import fetch_quote_keys, save_quotes, upload_image
+
+    seen = SeenIndex(loader=fetch_quote_keys) if SCRAPER_INCREMENTAL else None
+    writer = QuoteBatchWriter(save_quotes, on_saved=seen.record if seen else None)
+    writer.start()
+    slots = asyncio.Semaphore(jobs_per_worker)
+    running: set[asyncio.Task] = set()
+
+    async def run(job_id: str, topic: str):
+        try:
+            async for event in enriched_events(topic, upload=upload_image, writer=writer, cache=image_cache, seen=seen):
+                event_queue.put((job_id, event))
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            event_queue.put((job_id, {"error": f"Stream interrupted: {str(e)}"}))
+        finally:
+            event_queue.put((job_id, None))
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            message = await asyncio.to_thread(task_queue.get)
+            if message is None:
+                break
+            task = asyncio.create_task(run(*message))
+            running.add(task)
+            task.add_done_callback(running.discard)
+        await asyncio.gather(*running, return_exceptions=True)
+    finally:
+        await writer.close()
+        await close_engines()
+        await close_image_client()
+        image_cache.close()
+        await browser_pool.close()
@@ -0,0 +1,207 @@
+import asyncio
+import bisect
+import logging
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Iterator
+
+from config import (
+    QUOTE_EXPORT_PAGE_SIZE,
+    QUOTE_INDEX_HOT_AFTER,
+    QUOTE_INDEX_MAX_ROWS,
+    QUOTE_INDEX_MAX_TOPICS,
+    QUOTE_INDEX_TTL,
+)
+from scraper.utils import normalize_topic
+
+logger = logging.getLogger(__name__)
+
+class _TopicIndex:
+    """Every stored quote of a topic, sorted by id, with an inverted index of its authors."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = sorted(rows, key=lambda row: row["id"])
+        self.ids = [row["id"] for row in self.rows]
+        self.loaded = time.monotonic()
+        self.by_author: dict[str, set[int]] = {}
+        for position, row in enumerate(self.rows):
+            self.by_author.setdefault((row.get("author") or "").lower(), set()).add(position)
+
+    def query(self, after_id: int | None, author: str | None) -> Iterator[dict]:
+        matches = self.by_author.get(author.lower(), set()) if author else None
+        start = bisect.bisect_right(self.ids, after_id) if after_id is not None else 0
+        if matches is None:
+            yield from self.rows[start:]
+            return
+        for position in sorted(p for p in matches if p >= start):
+            yield self.rows[position]
+
+
+class QuoteSearch:
+    """
+    Reads stored quotes with keyset pagination, filters and projection.
+
+    Queries go to the database (`list_page`: the list_quotes call of
+    QuoteRepository). Topics queried at least `hot_after` times within `ttl`
+    are loaded whole, up to `max_rows` quotes, into an in-memory index that
+    then answers their queries (same filters, same ordering) until it
+    expires or new quotes of the topic get saved. Text searches always go
+    to the database, whose full-text parser we do not replicate.
+
+    Quotes saved by other processes (job workers) do not reach `invalidate`:
+    topics for which `busy(topic)` is true are neither indexed nor served
+    from an index.
+    """
+
+    def __init__(
+        self,
+        list_page: Callable[..., list[dict]],
+        ttl: float = QUOTE_INDEX_TTL,
+        hot_after: int = QUOTE_INDEX_HOT_AFTER,
+        max_topics: int = QUOTE_INDEX_MAX_TOPICS,
+        max_rows: int = QUOTE_INDEX_MAX_ROWS,
+        export_page_size: int = QUOTE_EXPORT_PAGE_SIZE,
+        busy: Callable[[str], bool] | None = None,
+    ):
+        self.list_page = list_page
+        self.ttl = ttl
+        self.hot_after = hot_after
+        self.max_topics = max_topics
+        self.max_rows = max_rows
+        self.export_page_size = export_page_size
+        self.busy = busy
+
+        self._indexes: OrderedDict[str, _TopicIndex] = OrderedDict()
+        # Requests per topic since the start of the current ttl window
+        self._requests: dict[str, tuple[float, int]] = {}
+        self._too_large: dict[str, float] = {}
+        self._loading: dict[str, asyncio.Task] = {}
+
+        self._index_hits = 0
+        self._db_queries = 0
+        self._loads = 0
+
+    def _hot(self, key: str) -> bool:
+        now = time.monotonic()
+        since, count = self._requests.get(key, (now, 0))
+        if now - since > self.ttl:
+            since, count = now, 0
+        self._requests[key] = (since, count + 1)
+        return count + 1 >= self.hot_after
+
+    def _load(self, topic: str) -> _TopicIndex | None:
+        rows = []
+        after_id = None
+        while True:
+            page = self.list_page(limit=self.export_page_size, after_id=after_id, topic=topic)
+            rows.extend(page)
+            if len(rows) > self.max_rows:
+                return None
+            if len(page) < self.export_page_size:
+                return _TopicIndex(rows)
+            after_id = page[-1]["id"]
+
+    async def _index(self, topic: str | None) -> _TopicIndex | None:
+        """In-memory index of `topic` if it is (or just became) hot, else None."""
+        if not topic:
+            return None
+        key = normalize_topic(topic)
+        if self.busy is not None and self.busy(key):
+            # Being scraped elsewhere: any index of it is already outdated
+            self._indexes.pop(key, None)
+            return None
+        index = self._indexes.get(key)
+        if index is not None:
+            if time.monotonic() - index.loaded <= self.ttl:
+                self._indexes.move_to_end(key)
+                return index
+            del self._indexes[key]
+
+        if not self._hot(key) or time.monotonic() - self._too_large.get(key, -self.ttl) <= self.ttl:
+            return None
+
+        # Concurrent requests share one load
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(asyncio.to_thread(self._load, key))
+            self._loading[key] = task
+        try:
+            index = await asyncio.shield(task)
+        finally:
+            self._loading.pop(key, None)
+
+        if index is None:
+            logger.info(f"Topic '{key}' has more than {self.max_rows} quotes, not indexed")
+            self._too_large[key] = time.monotonic()
+            return None
+        if key not in self._indexes:
+            self._loads += 1
+            self._indexes[key] = index
+            if len(self._indexes) > self.max_topics:
+                self._indexes.popitem(last=False)
+        return self._indexes[key]
+
+    def invalidate(self, rows: list[dict]):
+        """Drops the indexes of the topics of newly saved quotes."""
+        for row in rows:
+            self._indexes.pop(normalize_topic(row.get("topic") or ""), None)
+
+    @staticmethod
+    def _project(row: dict, fields: list[str] | None) -> dict:
+        if not fields:
+            return row
+        return {field: row.get(field) for field in fields}
+
+    async def page(
+        self,
+        limit: int,
+        after_id: int | None = None,
+        topic: str | None = None,
+        author: str | None = None,
+        search: str | None = None,
+        fields: list[str] | None = None,
+    ) -> tuple[list[dict], int | None]:
+        """One page of quotes and the cursor of the next one (None on the last page)."""
+        index = await self._index(topic) if not search else None
+        if index is not None:
+            self._index_hits += 1
+            rows = []
+            for row in index.query(after_id, author):
+                rows.append(row)
+                if len(rows) > limit:
+                    break
+        else:
+            self._db_queries += 1
+            # One extra row tells whether there is a next page
+            rows = await asyncio.to_thread(
+                self.list_page,
+                limit=limit + 1, after_id=after_id, topic=topic, author=author, search=search, columns=fields,
+            )
+
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return [self._project(row, fields) for row in rows[:limit]], next_cursor
+
+    async def export(
+        self,
+        after_id: int | None = None,
+        topic: str | None = None,
+        author: str | None = None,
+        search: str | None = None,
+        fields: list[str] | None = None,
+    ) -> AsyncIterator[dict]:
+        """Every matching quote, read page by page: memory stays bounded by one page."""
+        while True:
+            rows, after_id = await self.page(self.export_page_size, after_id, topic, author, search, fields)
+            for row in rows:
+                yield row
+            if after_id is None:
+                return
+
+    def metrics(self) -> dict:
+        return {
+            "indexed_topics": len(self._indexes),
+            "indexed_quotes": sum(len(index.rows) for index in self._indexes.values()),
+            "index_loads": self._loads,
+            "index_hits": self._index_hits,
+            "db_queries": self._db_queries,
+        }
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from config import QUOTE_BATCH_SIZE, QUOTE_FLUSH_INTERVAL
+from scraper.metrics import metrics
+from scraper.utils import quote_key
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteBatchWriter:
+    """
+    Write-behind buffer for quotes.
+
+    Rows are deduplicated on quote_key (link, or text for quotes without a
+    link of their own) while they wait, then sent as one multi-row upsert
+    when `batch_size` rows are pending or every `flush_interval` seconds. `sink(rows)` is a blocking call (Supabase,
+    PostgREST, in-memory fake...) and runs in a worker thread.
+    `on_saved(rows)`, if given, is awaited after each successful flush.
+
+    When the sink fails, the rows go back to the buffer (behind any newer
+    version of the same quote) and are retried after an exponential
+    backoff, from `retry_backoff` up to `max_backoff` seconds.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[list[dict]], object],
+        batch_size: int = QUOTE_BATCH_SIZE,
+        flush_interval: float = QUOTE_FLUSH_INTERVAL,
+        on_saved: Callable[[list[dict]], Awaitable] | None = None,
+        retry_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.sink = sink
+        self.on_saved = on_saved
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+
+        self._pending: dict[str, dict] = {}
+        self._flush_lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        # Consecutive failed flushes, and when the next attempt may run
+        self._failures = 0
+        self._retry_at = 0.0
+        self._last_error: str | None = None
+
+        self._flushes = 0
+        self._rows_written = 0
+        self._duplicates = 0
+        self._errors = 0
+        self._flush_total = 0.0
+        self._flush_max = 0.0
+
+    def start(self):
+        """Starts the periodic flush."""
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_periodically())
+
+    async def close(self, attempts: int = 3):
+        """Stops the periodic flush and writes what is still pending (a few attempts)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            await asyncio.gather(self._timer, return_exceptions=True)
+            self._timer = None
+        for attempt in range(attempts):
+            if attempt:
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            # Shutting down: no waiting for the retry schedule
+            self._retry_at = 0.0
+            if await self.flush():
+                return
+        logger.error(f"{len(self._pending)} quotes could not be saved: {self._last_error}")
+
+    @property
+    def last_error(self) -> str | None:
+        """Error of the last failed write, None once a write succeeds again."""
+        return self._last_error if self._failures else None
+
+    @staticmethod
+    def _key(quote: dict) -> str:
+        return quote_key(quote) or ""
+
+    def _write(self, rows: list[dict]):
+        """Calls the sink; rows sharing a link (quotes without their own) go in separate upserts,
+        since one upsert cannot touch the same conflict key twice."""
+        while rows:
+            batch, rest, links = [], [], set()
+            for row in rows:
+                link = row.get("link")
+                (rest if link in links else batch).append(row)
+                links.add(link)
+            self.sink(batch)
+            rows = rest
+
+    def buffer(self, quote: dict):
+        """Adds a quote without flushing (written by the next periodic or explicit flush)."""
+        key = self._key(quote)
+        if key in self._pending:
+            self._duplicates += 1
+        # Latest version wins (e.g. once the stored image URL is known)
+        self._pending[key] = quote
+
+    async def add(self, quote: dict):
+        self.buffer(quote)
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> bool:
+        """
+        Writes the pending rows. Returns False if they could not be written
+        (the write failed, or the retry after a failure is not due yet).
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return True
+            if time.monotonic() < self._retry_at:
+                return False
+            rows = list(self._pending.values())
+            self._pending = {}
+
+            started = time.perf_counter()
+            try:
+                with metrics.span("db_save"):
+                    await asyncio.to_thread(self._write, rows)
+            except Exception as e:
+                self._errors += 1
+                self._failures += 1
+                self._last_error = str(e)
+                delay = min(self.retry_backoff * 2 ** (self._failures - 1), self.max_backoff)
+                self._retry_at = time.monotonic() + delay
+                # Back in the buffer, unless a newer version was added meanwhile
+                for row in rows:
+                    self._pending.setdefault(self._key(row), row)
+                logger.error(f"Error saving {len(rows)} quotes, retrying in {delay:.0f}s: {e}")
+                return False
+
+            self._failures = 0
+            self._retry_at = 0.0
+            elapsed = time.perf_counter() - started
+            self._flushes += 1
+            self._rows_written += len(rows)
+            self._flush_total += elapsed
+            self._flush_max = max(self._flush_max, elapsed)
+            logger.info(f"Saved {len(rows)} quotes in {elapsed * 1000:.0f} ms")
+            if self.on_saved is not None:
+                await self.on_saved(rows)
+        return True
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def metrics(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "flushes": self._flushes,
+            "rows_written": self._rows_written,
+            "duplicates_dropped": self._duplicates,
+            "errors": self._errors,
+            "retrying": self._failures > 0,
+            "last_error": self._last_error,
+            "flush_avg_ms": round(1000 * self._flush_total / self._flushes, 2) if self._flushes else 0.0,
+            "flush_max_ms": round(1000 * self._flush_max, 2),
+        }
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+
+from config import PIPELINE_QUEUE_SIZE
+from scraper.brainyquote_scraper import scrape_brainyquote_generator
+from scraper.metrics import start_trace
+from scraper.scheduler import PageScheduler
+from scraper.utils import normalize_topic
+from services.image_cache import ImageCache
+from services.image_pipeline import ImagePipeline
+from services.quote_writer import QuoteBatchWriter
+from services.seen_index import SeenIndex
+
+logger = logging.getLogger(__name__)
+
+
+async def _produce(
+    topic: str,
+    out: asyncio.Queue,
+    upload: Callable[..., str | None],
+    writer: QuoteBatchWriter,
+    cache: ImageCache | None,
+    scheduler: PageScheduler | None = None,
+    seen: SeenIndex | None = None,
+    trace: bool = False,
+):
+    """Streams quotes to `out` right away; images and saves run in the pipeline."""
+    # Quotes are stored under the topic's slug, whatever spelling the client used
+    topic = normalize_topic(topic)
+    # Before the pipeline: its workers inherit the trace
+    spans = start_trace() if trace else None
+    pipeline = ImagePipeline(emit=out.put, upload=upload, save=writer.add, cache=cache)
+    final_event = None
+    try:
+        known = await seen.load(topic) if seen is not None else None
+        async with aclosing(scrape_brainyquote_generator(topic, scheduler=scheduler, known=known)) as events:
+            async for data in events:
+                if "done" in data and seen is not None:
+                    seen.account(data.get("pages_skipped", 0), data.get("quotes_skipped", 0))
+                if "done" in data or "error" in data:
+                    # Sent once the pipeline is drained so the client also gets every image_ready
+                    final_event = data
+                    continue
+
+                # Save to Supabase if it's a quote item (has text and author)
+                if "text" in data and "author" in data:
+                    # Enrich with topic
+                    data["topic"] = topic
+                    await out.put(data)
+                    await pipeline.submit(dict(data))
+                else:
+                    await out.put(data)
+
+        await pipeline.join()
+        if not await writer.flush() and final_event and "done" in final_event:
+            # Quotes kept in the writer for a retry: the client is told they are not stored yet
+            final_event["save_error"] = writer.last_error
+    except Exception as e:
+        logger.error(f"Stream error: {e}")
+        final_event = {"error": f"Stream interrupted: {str(e)}"}
+    finally:
+        await pipeline.close()
+        # Quotes the client already got but the pipeline had not saved yet (scrape
+        # failed or cancelled): stored anyway, with their original image URL if need be
+        for quote in pipeline.unsaved():
+            writer.buffer(quote)
+
+    if spans is not None:
+        await out.put({"trace": spans.summary()})
+    if final_event:
+        await out.put(final_event)
+    await out.put(None)
+
+
+async def enriched_events(
+    topic: str,
+    upload: Callable[..., str | None],
+    writer: QuoteBatchWriter,
+    cache: ImageCache | None = None,
+    scheduler: PageScheduler | None = None,
+    seen: SeenIndex | None = None,
+    trace: bool = False,
+) -> AsyncIterator[dict]:
+    """
+    Full event stream of a topic scrape as sent to clients: scraper events,
+    then image_ready events as images get stored, then done/error.
+    Quotes are persisted through `writer` along the way. With a `seen`
+    index the scrape is incremental (only quotes not stored yet). With
+    `trace`, a {"trace": {"wall_ms", "spans"}} summary of the time spent
+    per step of this scrape comes right before done/error.
+    """
+    out: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    producer = asyncio.create_task(_produce(topic, out, upload, writer, cache, scheduler, seen, trace))
+    try:
+        while (data := await out.get()) is not None:
+            yield data
+    finally:
+        # Consumer gone: stop scraping and enrichment
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+
+
+def _tag(topic: str, data: dict) -> dict:
+    """
+    Labels an event with its topic. A topic's own done/error become
+    topic_done/topic_error, so clients reading the multiplexed stream
+    with the single-topic loop only stop at the batch's final done.
+    """
+    if "done" in data:
+        summary = {key: value for key, value in data.items() if key != "done"}
+        return {"topic": topic, "topic_done": True, **summary}
+    if "error" in data:
+        return {"topic": topic, "topic_error": data["error"]}
+    return {**data, "topic": topic}
+
+
+async def batch_events(
+    topics: list[str],
+    upload: Callable[..., str | None],
+    writer: QuoteBatchWriter,
+    cache: ImageCache | None = None,
+    scheduler: PageScheduler | None = None,
+    seen: SeenIndex | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Scrapes several topics at once and multiplexes their event streams,
+    each event tagged with its `topic`. Page fetches of all topics go
+    through one PageScheduler (fair across topics, shared page budget).
+    Ends with {"done": True, "topics": {topic: "done" | "error"}, "pages": n,
+    "budget_exhausted": bool}.
+    """
+    scheduler = scheduler or PageScheduler()
+    scheduler.start()
+    out: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    outcome = {topic: "error" for topic in topics}
+
+    async def forward(topic: str):
+        try:
+            async for data in enriched_events(topic, upload, writer, cache, scheduler=scheduler, seen=seen):
+                if "done" in data:
+                    outcome[topic] = "done"
+                await out.put(_tag(topic, data))
+        except Exception as e:
+            logger.error(f"Batch stream error on '{topic}': {e}")
+            await out.put(_tag(topic, {"error": f"Stream interrupted: {str(e)}"}))
+        await out.put(None)
+
+    producers = [asyncio.create_task(forward(topic)) for topic in topics]
+    try:
+        remaining = len(producers)
+        while remaining:
+            data = await out.get()
+            if data is None:
+                remaining -= 1
+                continue
+            yield data
+        yield {
+            "done": True,
+            "topics": outcome,
+            "pages": scheduler.pages_fetched,
+            "budget_exhausted": scheduler.budget_left == 0,
+        }
+    finally:
+        for producer in producers:
+            producer.cancel()
+        await asyncio.gather(*producers, return_exceptions=True)
+        await scheduler.close()
@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from typing import Callable
+
+from config import SEEN_INDEX_DIR, SEEN_INDEX_MAX_TOPICS
+from scraper.utils import normalize_topic, quote_key
+
+logger = logging.getLogger(__name__)
+
+
+class SeenIndex:
+    """
+    Keys (link, or text hash) of the quotes already stored, per topic,
+    for incremental re-scrapes.
+
+    A topic's keys are loaded on first use from its local snapshot (one JSON
+    file per topic), or else from persistence with `loader(topic)` (blocking,
+    returns stored rows). Keys of quotes saved afterwards are added through
+    `record`, which the quote writer calls after each successful flush, and
+    the snapshot is rewritten, merged with the keys already on disk (other
+    processes record into the same snapshots).
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], list[dict]] | None = None,
+        directory: str = SEEN_INDEX_DIR,
+        max_topics: int = SEEN_INDEX_MAX_TOPICS,
+    ):
+        self.loader = loader
+        self.directory = directory
+        self.max_topics = max_topics
+
+        self._topics: OrderedDict[str, set[str]] = OrderedDict()
+        self._loading: dict[str, asyncio.Task] = {}
+
+        self._pages_skipped = 0
+        self._quotes_skipped = 0
+        self._rescrapes = 0
+
+    def _path(self, key: str) -> str:
+        # Topics are user input: never use them as file names directly
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def _remember(self, key: str, keys: set[str]) -> set[str]:
+        self._topics[key] = keys
+        self._topics.move_to_end(key)
+        if len(self._topics) > self.max_topics:
+            self._topics.popitem(last=False)
+        return keys
+
+    def _read(self, key: str, topic: str) -> set[str]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return set(json.load(f)["keys"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Unreadable seen-index snapshot for '{key}': {e}")
+
+        if self.loader is None:
+            return set()
+        try:
+            rows = self.loader(topic)
+        except Exception as e:
+            # Unknown history: the scrape simply runs in full
+            logger.warning(f"Could not load stored quotes of '{key}': {e}")
+            return set()
+        return {k for k in (quote_key(row) for row in rows) if k}
+
+    def _write(self, key: str, keys: set[str]) -> set[str]:
+        """Writes `keys` plus those of the current snapshot; returns the merged set."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                keys = keys | set(json.load(f)["keys"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Unreadable seen-index snapshot for '{key}', overwriting it: {e}")
+        # One temporary file per process, so concurrent writers never share one
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"topic": key, "keys": list(keys)}, f)
+        os.replace(tmp, path)
+        return keys
+
+    def _extend(self, key: str, keys: set[str]):
+        """Adds `keys` to the snapshot of a topic that is not in memory, if it has one."""
+        if os.path.exists(self._path(key)):
+            self._write(key, keys)
+
+    async def load(self, topic: str) -> set[str]:
+        """
+        Copy of the known keys of `topic`, taken now: quotes saved later by
+        this or a concurrent scrape must not make it stop early.
+        """
+        key = normalize_topic(topic)
+        if key in self._topics:
+            self._topics.move_to_end(key)
+            return set(self._topics[key])
+
+        # Concurrent scrapes of a topic share one load
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.create_task(asyncio.to_thread(self._read, key, topic))
+            self._loading[key] = task
+        try:
+            keys = await asyncio.shield(task)
+        finally:
+            self._loading.pop(key, None)
+        if key in self._topics:
+            return set(self._topics[key])
+        logger.info(f"Seen index of '{key}': {len(keys)} known quotes")
+        return set(self._remember(key, keys))
+
+    async def record(self, rows: list[dict]):
+        """Adds saved quotes to their topics' indexes and rewrites the snapshots."""
+        changed: dict[str, set[str]] = {}
+        unloaded: dict[str, set[str]] = {}
+        for row in rows:
+            key, topic_key = quote_key(row), normalize_topic(row.get("topic") or "")
+            if not key or not topic_key:
+                continue
+            keys = self._topics.get(topic_key)
+            if keys is None:
+                # Not in memory, but the next load prefers the snapshot over
+                # persistence: it must have these rows too
+                unloaded.setdefault(topic_key, set()).add(key)
+                continue
+            keys.add(key)
+            changed[topic_key] = keys
+
+        for topic_key, keys in unloaded.items():
+            try:
+                await asyncio.to_thread(self._extend, topic_key, keys)
+            except Exception as e:
+                logger.warning(f"Could not write seen-index snapshot for '{topic_key}': {e}")
+
+        for topic_key, keys in changed.items():
+            try:
+                merged = await asyncio.to_thread(self._write, topic_key, set(keys))
+                keys |= merged
+            except Exception as e:
+                logger.warning(f"Could not write seen-index snapshot for '{topic_key}': {e}")
+
+    def account(self, pages_skipped: int, quotes_skipped: int):
+        self._rescrapes += 1
+        self._pages_skipped += pages_skipped
+        self._quotes_skipped += quotes_skipped
+
+    def metrics(self) -> dict:
+        return {
+            "topics": len(self._topics),
+            "incremental_scrapes": self._rescrapes,
+            "pages_skipped": self._pages_skipped,
+            "writes_skipped": self._quotes_skipped,
+        }
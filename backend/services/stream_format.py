@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import time
+import zlib
+from typing import AsyncIterator
+
+from config import STREAM_COMPRESSION, STREAM_COMPRESSION_LEVEL, STREAM_FLUSH_INTERVAL
+from scraper.utils import BASE_URL, normalize_topic
+
+logger = logging.getLogger(__name__)
+
+# Optional dependencies: orjson (faster serializer), zstandard, msgpack
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMATS = ("ndjson", "compact", "msgpack")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "compact": "application/x-ndjson", "msgpack": "application/x-msgpack"}
+
+
+def dumps(event: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(event)
+    return json.dumps(event, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def available_encodings() -> list[str]:
+    """Content-Encodings the server can produce, in order of preference."""
+    if STREAM_COMPRESSION == "off":
+        return []
+    return (["zstd"] if zstandard is not None else []) + ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Picks the best Content-Encoding also listed in the client's Accept-Encoding (q=0 excluded)."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    pass
+        if name and quality > 0:
+            accepted.add(name.lower())
+    for encoding in available_encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+class CompactEncoder:
+    """
+    Shorter events for single-topic streams ("compact" and "msgpack" formats).
+
+    The stream opens with {"v": 1, "base": site URL, "topic": topic}. Quotes
+    become {"q": text, "a": author, "l": link, "i": image_url}; links and
+    image URLs on the site lose the base prefix (they then start with "/").
+    progress/total are not repeated: a page event {"pg": page, "n": total}
+    resets the count, each following quote counts one, and a record that
+    could not be read is {"s": 1}. image_ready becomes {"r": link, "i": url}.
+    Any other event (done, error...) is sent unchanged.
+    """
+
+    def __init__(self, topic: str | None = None, base: str = BASE_URL):
+        self.topic = topic
+        self.base = base
+        self._topic_key = normalize_topic(topic) if topic else None
+
+    def header(self) -> dict:
+        return {"v": 1, "base": self.base, "topic": self.topic}
+
+    def _strip(self, url: str | None) -> str | None:
+        if url and url.startswith(self.base + "/"):
+            return url[len(self.base):]
+        return url
+
+    def encode(self, event: dict) -> dict:
+        if "text" in event and "author" in event:
+            compact = {"q": event["text"], "a": event["author"], "l": self._strip(event.get("link"))}
+            if event.get("image_url"):
+                compact["i"] = self._strip(event["image_url"])
+            if event.get("topic") and normalize_topic(event["topic"]) != self._topic_key:
+                compact["t"] = event["topic"]
+            return compact
+        if "image_ready" in event:
+            return {"r": self._strip(event["image_ready"]), "i": self._strip(event.get("image_url"))}
+        if "page" in event and "total" in event and len(event) == 2:
+            return {"pg": event["page"], "n": event["total"]}
+        if "progress" in event and "total" in event and len(event) == 2:
+            return {"s": 1}
+        return event
+
+
+class _Compressor:
+    def __init__(self, encoding: str, level: int | None = STREAM_COMPRESSION_LEVEL):
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level or 3).compressobj()
+            self._sync = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            # wbits=31: gzip container
+            self._obj = zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+            self._sync = zlib.Z_SYNC_FLUSH
+
+    def write(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        """Everything written so far, decodable by the client right away."""
+        return self._obj.flush(self._sync)
+
+    def close(self) -> bytes:
+        return self._obj.flush()
+
+
+# Events read ahead of a compressed stream's encoder
+_READ_AHEAD = 64
+_END = object()
+
+
+class _Failed:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def _pump(iterator: AsyncIterator[dict], queue: asyncio.Queue):
+    """Moves the events into `queue` (then _END, or _Failed if the source raised)."""
+    try:
+        async for event in iterator:
+            await queue.put(event)
+    except Exception as e:
+        await queue.put(_Failed(e))
+        return
+    await queue.put(_END)
+
+
+async def encode_stream(
+    events: AsyncIterator[dict],
+    format: str = "ndjson",
+    encoding: str | None = None,
+    topic: str | None = None,
+    flush_interval: float = STREAM_FLUSH_INTERVAL,
+) -> AsyncIterator[bytes]:
+    """
+    Serializes an event stream for the wire.
+
+    NDJSON lines (orjson when installed) or msgpack frames, optionally with
+    compact events (CompactEncoder), optionally gzip/zstd-compressed. A
+    compressed stream is flushed right after its first event, then at most
+    every `flush_interval` seconds, or sooner when no new event arrived
+    within that time: the client never waits longer than that for data the
+    server already has.
+
+    The compressed path reads the source through one pump task and a queue,
+    so waiting for the next event with a deadline costs no task per event;
+    the deadline only applies while compressed data is buffered.
+    """
+    compact = CompactEncoder(topic) if format in ("compact", "msgpack") else None
+    if format == "msgpack":
+        packer = msgpack.Packer()
+        serialize = packer.pack
+    else:
+        def serialize(event: dict) -> bytes:
+            return dumps(event) + b"\n"
+
+    if encoding is None:
+        if compact is not None:
+            yield serialize(compact.header())
+        async for event in events:
+            yield serialize(compact.encode(event) if compact else event)
+        return
+
+    compressor = _Compressor(encoding)
+    iterator = aiter(events)
+    queue: asyncio.Queue = asyncio.Queue(_READ_AHEAD)
+    pump = asyncio.create_task(_pump(iterator, queue))
+    last_flush = float("-inf")
+    dirty = False
+    try:
+        if compact is not None:
+            compressed = compressor.write(serialize(compact.header()))
+            dirty = True
+        else:
+            compressed = b""
+        while True:
+            if not dirty or not queue.empty():
+                item = await queue.get()
+            else:
+                try:
+                    async with asyncio.timeout(max(flush_interval - (time.monotonic() - last_flush), 0)):
+                        item = await queue.get()
+                except TimeoutError:
+                    # Nothing new for a while: send what is buffered
+                    yield compressed + compressor.flush()
+                    compressed, dirty, last_flush = b"", False, time.monotonic()
+                    continue
+
+            if item is _END:
+                break
+            if isinstance(item, _Failed):
+                raise item.error
+            compressed += compressor.write(serialize(compact.encode(item) if compact else item))
+            dirty = True
+            if time.monotonic() - last_flush >= flush_interval:
+                yield compressed + compressor.flush()
+                compressed, dirty, last_flush = b"", False, time.monotonic()
+
+        yield compressed + compressor.close()
+    finally:
+        pump.cancel()
+        await asyncio.gather(pump, return_exceptions=True)
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
@@ -1,6 +1,7 @@
 import os
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from scraper.utils import topic_pattern
 
 load_dotenv()
 
@@ -16,15 +17,15 @@ supabase: Client = create_client(
     SUPABASE_KEY 
 )
 
+# Columns of the 'quotes' table written by the scraper
+QUOTE_COLUMNS = ["text", "author", "link", "image_url", "topic"]
+
 def save_quote(quote_data: dict):
     """
     Inserts a quote into the 'quotes' table.
     """
-    # Define valid columns for the table
-    valid_columns = ["text", "author", "link", "image_url", "topic"]
-    
     # Filter data to only include valid columns
-    payload = {k: v for k, v in quote_data.items() if k in valid_columns}
+    payload = {k: v for k, v in quote_data.items() if k in QUOTE_COLUMNS}
     
     try:
         # Use upsert to handle potential duplicates if a unique constraint exists (e.g. on link or text)
@@ -36,6 +37,31 @@ def save_quote(quote_data: dict):
         print(f"Error saving quote: {e}")
         return None
 
+def save_quotes(quotes: list[dict]):
+    """
+    Upserts several quotes in a single request (conflicts resolved on the unique 'link').
+    Raises on failure so that the caller can account for it.
+    """
+    payload = [{k: v for k, v in quote.items() if k in QUOTE_COLUMNS} for quote in quotes]
+    return supabase.table("quotes").upsert(payload, on_conflict="link").execute()
+
+def fetch_quote_keys(topic: str, page_size: int = 1000) -> list[dict]:
+    """
+    Link and text of every stored quote of a topic (whatever its stored
+    spelling, see topic_pattern), read page by page since PostgREST caps
+    the rows per request.
+    """
+    pattern = topic_pattern(topic)
+    rows = []
+    start = 0
+    while True:
+        response = supabase.table("quotes").select("link,text").filter("topic", "imatch", pattern)\
+            .range(start, start + page_size - 1).execute()
+        rows.extend(response.data or [])
+        if len(response.data or []) < page_size:
+            return rows
+        start += page_size
+
 def upload_image(file_content: bytes, file_name: str, content_type: str = "image/jpeg") -> str | None:
     """
     Uploads an image to Supabase Storage 'quote-images' bucket.
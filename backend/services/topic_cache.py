@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import AsyncIterator, Callable
+
+from config import TOPIC_CACHE_DIR, TOPIC_CACHE_MAX_ENTRIES, TOPIC_CACHE_STALE_TTL, TOPIC_CACHE_TTL
+from scraper.utils import normalize_topic
+from services.event_log import EventLog
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """One running scrape whose events are shared by every client asking for the topic."""
+
+    def __init__(self):
+        self.log = EventLog()
+        self.task: asyncio.Task | None = None
+
+
+class TopicCache:
+    """
+    Result cache in front of the topic scrape.
+
+    Completed streams are kept in a memory LRU and on disk (one JSON file per
+    topic). A fresh entry (younger than `ttl`) is replayed at once; a stale
+    one (up to `ttl + stale_ttl`) is replayed too while a background scrape
+    refreshes it. Concurrent requests for a topic that is not cached share a
+    single running scrape.
+
+    With `store` off, only that sharing remains: incremental scrapes
+    (SCRAPER_INCREMENTAL) send just the quotes not yet saved, so their
+    result would replay as empty until it expires.
+    """
+
+    def __init__(
+        self,
+        producer: Callable[[str], AsyncIterator[dict]],
+        directory: str = TOPIC_CACHE_DIR,
+        ttl: float = TOPIC_CACHE_TTL,
+        stale_ttl: float = TOPIC_CACHE_STALE_TTL,
+        max_entries: int = TOPIC_CACHE_MAX_ENTRIES,
+        store: bool = True,
+    ):
+        self.producer = producer
+        self.directory = directory
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.store = store
+
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        self._flights: dict[str, _Flight] = {}
+
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._shared = 0
+
+    def _path(self, key: str) -> str:
+        # Topics are user input: never use them as file names directly
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def _remember(self, key: str, entry: dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Unreadable topic cache entry for '{key}': {e}")
+            return None
+
+    def _write_disk(self, key: str, entry: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    async def _lookup(self, key: str) -> dict | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is None:
+                return None
+        self._remember(key, entry)
+        return entry
+
+    async def _run(self, key: str, flight: _Flight):
+        try:
+            async with aclosing(self.producer(key)) as events:
+                async for event in events:
+                    flight.log.append(event)
+
+            # Only complete scrapes are worth replaying
+            if self.store and flight.log.events and flight.log.events[-1].get("done"):
+                entry = {"created": time.time(), "events": flight.log.events}
+                self._remember(key, entry)
+                try:
+                    await asyncio.to_thread(self._write_disk, key, entry)
+                except Exception as e:
+                    logger.warning(f"Could not write topic cache entry for '{key}': {e}")
+        except Exception as e:
+            logger.error(f"Scrape of '{key}' failed: {e}")
+            flight.log.append({"error": f"Stream interrupted: {str(e)}"})
+        finally:
+            self._flights.pop(key, None)
+            flight.log.close()
+
+    def _start_flight(self, key: str) -> tuple[_Flight, bool]:
+        """Returns the running scrape of `key`, starting one if needed, and whether it was started."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _Flight()
+        self._flights[key] = flight
+        flight.task = asyncio.create_task(self._run(key, flight))
+        return flight, True
+
+    async def stream(self, topic: str) -> AsyncIterator[dict]:
+        key = normalize_topic(topic)
+        entry = await self._lookup(key) if self.store and self.ttl > 0 else None
+        age = time.time() - entry["created"] if entry else None
+
+        if entry and age < self.ttl:
+            self._hits += 1
+            logger.info(f"Topic cache hit for '{key}'")
+        elif entry and age < self.ttl + self.stale_ttl:
+            self._stale_hits += 1
+            logger.info(f"Serving stale cache for '{key}', refreshing in background")
+            self._start_flight(key)
+        else:
+            flight, started = self._start_flight(key)
+            if started:
+                self._misses += 1
+            else:
+                self._shared += 1
+                logger.info(f"Joining the running scrape of '{key}'")
+            async for event in flight.log.follow():
+                yield event
+            return
+
+        for event in entry["events"]:
+            yield event
+
+    async def close(self):
+        """Cancels running scrapes (shutdown)."""
+        tasks = [flight.task for flight in self._flights.values() if flight.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def metrics(self) -> dict:
+        return {
+            "entries_in_memory": len(self._memory),
+            "running_scrapes": len(self._flights),
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "shared": self._shared,
+        }
@@ -0,0 +1,40 @@
+from scraper.page_profile import FULL_PROFILE, PageProfile, lean_profile, profile_from_settings
+
+
+def test_full_profile_allows_everything():
+    assert not FULL_PROFILE.intercepts
+    assert FULL_PROFILE.allows("https://ads.example.net/pixel.gif", "image")
+    assert not FULL_PROFILE.shared_context
+
+
+def test_blocked_resource_types():
+    profile = PageProfile(name="test", blocked_resources=frozenset({"image", "font"}))
+    assert profile.intercepts
+    assert not profile.allows("https://www.brainyquote.com/photo.jpg", "image")
+    assert not profile.allows("https://www.brainyquote.com/font.woff2", "font")
+    assert profile.allows("https://www.brainyquote.com/topics/love-quotes", "document")
+
+
+def test_allowed_hosts_include_subdomains():
+    profile = PageProfile(name="test", allowed_hosts=("brainyquote.com",))
+    assert profile.allows("https://brainyquote.com/", "document")
+    assert profile.allows("https://static.brainyquote.com/app.js", "script")
+    assert not profile.allows("https://notbrainyquote.com/app.js", "script")
+    assert not profile.allows("https://brainyquote.com.evil.net/app.js", "script")
+    assert not profile.allows("data:text/plain,hello", "other")
+
+
+def test_lean_profile_always_allows_the_scraped_site():
+    profile = lean_profile(blocked_resources=["image"], allowed_hosts=["cdn.example.org"], javascript=False)
+    assert profile.shared_context
+    assert not profile.javascript
+    assert profile.allowed_hosts[0] == "brainyquote.com"
+    assert profile.allows("https://www.brainyquote.com/topics/love-quotes", "document")
+    assert profile.allows("https://cdn.example.org/lib.js", "script")
+    assert not profile.allows("https://tracker.example.com/t.js", "script")
+    assert not profile.allows("https://www.brainyquote.com/photo.jpg", "image")
+
+
+def test_profile_from_settings():
+    assert profile_from_settings("full") is FULL_PROFILE
+    assert profile_from_settings("lean").name == "lean"
@@ -0,0 +1,90 @@
+import asyncio
+import re
+
+from scraper.utils import topic_pattern
+from services.quote_search import QuoteSearch
+
+
+class FakeRepository:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.calls = 0
+
+    def list_quotes(self, limit=50, after_id=None, topic=None, author=None, search=None, columns=None):
+        self.calls += 1
+        rows = [row for row in self.rows if after_id is None or row["id"] > after_id]
+        if topic:
+            rows = [row for row in rows if re.match(topic_pattern(topic), row["topic"], re.IGNORECASE)]
+        if author:
+            rows = [row for row in rows if row["author"].lower() == author.lower()]
+        if search:
+            rows = [row for row in rows if all(word in row["text"].lower().split() for word in search.lower().split())]
+        return rows[:limit]
+
+
+ROWS = [
+    {"id": n, "text": f"Quote number {n}", "author": "Ada" if n % 2 else "Alan", "topic": "love"}
+    for n in range(1, 8)
+]
+
+
+def test_hot_topic_is_served_from_memory():
+    async def run():
+        repository = FakeRepository(ROWS)
+        search = QuoteSearch(repository.list_quotes, hot_after=1)
+        first, cursor = await search.page(3, topic="love", author="ada")
+        calls = repository.calls
+        second, _ = await search.page(3, after_id=cursor, topic="love", author="ada")
+        assert [row["id"] for row in first + second] == [1, 3, 5, 7]
+        assert repository.calls == calls
+
+    asyncio.run(run())
+
+
+def test_text_search_goes_to_the_database():
+    async def run():
+        repository = FakeRepository(ROWS)
+        search = QuoteSearch(repository.list_quotes, hot_after=1)
+        await search.page(10, topic="love")
+        calls = repository.calls
+        rows, _ = await search.page(10, topic="love", search="number 4")
+        assert [row["id"] for row in rows] == [4]
+        assert repository.calls == calls + 1
+
+    asyncio.run(run())
+
+
+def test_busy_topic_skips_the_index():
+    async def run():
+        repository = FakeRepository(ROWS)
+        busy = set()
+        search = QuoteSearch(repository.list_quotes, hot_after=1, busy=busy.__contains__)
+        await search.page(10, topic="love")
+        assert search.metrics()["indexed_topics"] == 1
+
+        busy.add("love")
+        repository.rows = ROWS + [{"id": 8, "text": "New quote", "author": "Ada", "topic": "love"}]
+        rows, _ = await search.page(10, topic="Love")
+        assert rows[-1]["id"] == 8
+        assert search.metrics()["indexed_topics"] == 0
+
+    asyncio.run(run())
+
+
+def test_every_spelling_of_a_topic_gets_the_same_quotes():
+    async def run():
+        repository = FakeRepository([
+            {"id": 1, "text": "Typed by a user", "author": "Ada", "topic": "Self Love"},
+            {"id": 2, "text": "Stored as a slug", "author": "Ada", "topic": "self-love"},
+            {"id": 3, "text": "Another topic", "author": "Ada", "topic": "self"},
+        ])
+        search = QuoteSearch(repository.list_quotes, hot_after=3)
+        results = []
+        # Cold (database) queries, then the index loaded by the third request
+        for spelling in ("Self Love", "self-love", "SELF LOVE ", "self-love"):
+            rows, _ = await search.page(10, topic=spelling)
+            results.append([row["id"] for row in rows])
+        assert results == [[1, 2]] * 4
+        assert search.metrics()["index_hits"] == 2
+
+    asyncio.run(run())
@@ -0,0 +1,125 @@
+import asyncio
+
+from scraper.utils import BASE_URL
+from services.quote_writer import QuoteBatchWriter
+
+
+class FakeTable:
+    """In-memory sink; fails the next `failures` writes."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.rows: dict[str, dict] = {}
+        self.writes: list[int] = []
+
+    def upsert(self, rows: list[dict]):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.writes.append(len(rows))
+        for row in rows:
+            self.rows[row["link"]] = row
+
+
+def quote(n: int, **fields) -> dict:
+    return {"text": f"Quote {n}", "author": "Author", "link": f"https://example.com/q{n}", **fields}
+
+
+def test_flushes_when_batch_is_full():
+    async def run():
+        table = FakeTable()
+        writer = QuoteBatchWriter(table.upsert, batch_size=3, flush_interval=60)
+        for n in range(7):
+            await writer.add(quote(n))
+        assert table.writes == [3, 3]
+        await writer.close()
+        assert table.writes == [3, 3, 1]
+        assert len(table.rows) == 7
+
+    asyncio.run(run())
+
+
+def test_flushes_on_interval():
+    async def run():
+        table = FakeTable()
+        writer = QuoteBatchWriter(table.upsert, batch_size=100, flush_interval=0.05)
+        writer.start()
+        await writer.add(quote(1))
+        await asyncio.sleep(0.2)
+        assert table.writes == [1]
+        await writer.close()
+
+    asyncio.run(run())
+
+
+def test_deduplicates_pending_rows():
+    async def run():
+        table = FakeTable()
+        writer = QuoteBatchWriter(table.upsert, batch_size=100, flush_interval=60)
+        await writer.add(quote(1))
+        await writer.add(quote(1, image_url="https://storage/q1.png"))
+        await writer.flush()
+        assert table.writes == [1]
+        assert table.rows["https://example.com/q1"]["image_url"] == "https://storage/q1.png"
+        assert writer.metrics()["duplicates_dropped"] == 1
+
+    asyncio.run(run())
+
+
+def test_failed_rows_are_requeued_and_retried():
+    async def run():
+        saved = []
+
+        async def on_saved(rows):
+            saved.extend(rows)
+
+        table = FakeTable(failures=1)
+        writer = QuoteBatchWriter(table.upsert, batch_size=100, flush_interval=60, on_saved=on_saved, retry_backoff=0.05)
+        await writer.add(quote(1))
+        await writer.add(quote(2))
+        assert await writer.flush() is False
+        assert writer.last_error == "database unavailable"
+        assert writer.metrics()["pending"] == 2
+
+        # Newer version added while the retry is pending: it is the one written
+        await writer.add(quote(2, image_url="https://storage/q2.png"))
+        # Retry not due yet
+        assert await writer.flush() is False
+        assert table.writes == []
+
+        await asyncio.sleep(0.06)
+        assert await writer.flush() is True
+        assert table.writes == [2]
+        assert table.rows["https://example.com/q2"]["image_url"] == "https://storage/q2.png"
+        assert len(saved) == 2
+        assert writer.last_error is None
+        assert writer.metrics()["errors"] == 1
+
+    asyncio.run(run())
+
+
+def test_close_retries_pending_rows():
+    async def run():
+        table = FakeTable(failures=2)
+        writer = QuoteBatchWriter(table.upsert, batch_size=100, flush_interval=60, retry_backoff=0.01)
+        await writer.add(quote(1))
+        await writer.close()
+        assert list(table.rows) == ["https://example.com/q1"]
+
+    asyncio.run(run())
+
+
+def test_quotes_without_their_own_link_are_not_merged():
+    async def run():
+        calls = []
+        writer = QuoteBatchWriter(calls.append, batch_size=100, flush_interval=60)
+        for n in range(3):
+            await writer.add({"text": f"Quote {n}", "author": "Author", "link": BASE_URL})
+        await writer.add({"text": "Quote 0", "author": "Author", "link": BASE_URL, "image_url": "https://example.com/0.jpg"})
+        assert writer.metrics()["duplicates_dropped"] == 1
+        assert await writer.flush()
+        # One upsert cannot hit the same link twice: one call per row sharing it
+        assert [len(batch) for batch in calls] == [1, 1, 1]
+        assert sorted(row["text"] for batch in calls for row in batch) == ["Quote 0", "Quote 1", "Quote 2"]
+
+    asyncio.run(run())
@@ -0,0 +1,87 @@
+import asyncio
+import multiprocessing
+import time
+
+from scraper.rate_limit import HostLimiter, TokenBucket
+
+
+def test_bucket_allows_bursts_then_the_rate():
+    async def run():
+        bucket = TokenBucket(rate=20, capacity=3)
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.acquire()
+        assert time.monotonic() - started < 0.02
+        await bucket.acquire()
+        assert time.monotonic() - started >= 0.04
+
+    asyncio.run(run())
+
+
+def test_pause_holds_acquisitions_even_without_a_rate():
+    async def run():
+        bucket = TokenBucket(rate=0, capacity=1)
+        bucket.pause(0.1)
+        started = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - started >= 0.09
+        started = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - started < 0.02
+
+    asyncio.run(run())
+
+
+def test_no_burst_saved_up_during_a_pause():
+    async def run():
+        bucket = TokenBucket(rate=10, capacity=5)
+        bucket.pause(0.1)
+        await bucket.acquire()
+        resumed = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - resumed >= 0.08
+
+    asyncio.run(run())
+
+
+def test_host_limiter_pauses_only_the_throttled_host():
+    async def run():
+        limiter = HostLimiter(concurrency=2, rate=0, burst=1)
+        limiter.pause("https://slow.example.com/page", 0.2)
+        started = time.monotonic()
+        async with limiter.limit("https://other.example.com/page"):
+            pass
+        assert time.monotonic() - started < 0.05
+        async with limiter.limit("https://slow.example.com/other"):
+            pass
+        assert time.monotonic() - started >= 0.19
+
+    asyncio.run(run())
+
+
+def test_shared_budget_is_drawn_on_by_every_limiter():
+    async def run():
+        context = multiprocessing.get_context("spawn")
+        api = HostLimiter(concurrency=4, rate=20, burst=2, shared_hosts=("www.example.com",))
+        worker = HostLimiter(concurrency=4, rate=20, burst=2, shared_hosts=("www.example.com",))
+        worker.attach(api.share(context))
+
+        started = time.monotonic()
+        async with api.limit("https://www.example.com/a"):
+            pass
+        async with worker.limit("https://www.example.com/b"):
+            pass
+        assert time.monotonic() - started < 0.02
+        # The burst of 2 is spent across both limiters
+        async with worker.limit("https://www.example.com/c"):
+            pass
+        assert time.monotonic() - started >= 0.04
+
+        # A pause requested through one limiter holds the other one too
+        api.pause("https://www.example.com/d", 0.1)
+        paused = time.monotonic()
+        async with worker.limit("https://www.example.com/e"):
+            pass
+        assert time.monotonic() - paused >= 0.09
+
+    asyncio.run(run())
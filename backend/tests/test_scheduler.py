@@ -0,0 +1,103 @@
+import asyncio
+import importlib
+
+from fastapi.testclient import TestClient
+
+from scraper.engine import PageResult
+from scraper.scheduler import BUDGET_EXHAUSTED, PageScheduler
+
+
+class FakeChain:
+    """Engine chain stand-in: records the pages it fetches, in order."""
+
+    def __init__(self, topic: str, fetched: list):
+        self.topic = topic
+        self.fetched = fetched
+
+    async def fetch(self, url: str, page_number: int):
+        self.fetched.append((self.topic, page_number))
+        await asyncio.sleep(0)
+        return PageResult(), None
+
+
+async def fetch_all(scheduler: PageScheduler, pages: dict[str, int], fetched: list) -> list:
+    """Queues every page of every topic before the workers start, then waits for them."""
+    requests = []
+    for topic, count in pages.items():
+        chain = FakeChain(topic, fetched)
+        requests += [
+            asyncio.create_task(scheduler.fetch(topic, chain, f"https://example.com/{topic}/{n}", n))
+            for n in range(1, count + 1)
+        ]
+    await asyncio.sleep(0)
+    scheduler.start()
+    try:
+        return await asyncio.gather(*requests)
+    finally:
+        await scheduler.close()
+
+
+def test_topics_are_served_round_robin():
+    async def run():
+        fetched = []
+        await fetch_all(PageScheduler(concurrency=1, page_budget=0), {"love": 3, "life": 1, "art": 2}, fetched)
+        return fetched
+
+    assert asyncio.run(run()) == [
+        ("love", 1), ("life", 1), ("art", 1),
+        ("love", 2), ("art", 2),
+        ("love", 3),
+    ]
+
+
+def test_page_budget_stops_fetching():
+    async def run():
+        fetched = []
+        scheduler = PageScheduler(concurrency=2, page_budget=3)
+        results = await fetch_all(scheduler, {"love": 3, "life": 2}, fetched)
+        # Past the budget, requests resolve at once
+        late = await scheduler.fetch("art", FakeChain("art", fetched), "https://example.com/art/1", 1)
+        return scheduler, fetched, results, late
+
+    scheduler, fetched, results, late = asyncio.run(run())
+    assert len(fetched) == 3
+    assert scheduler.pages_fetched == 3 and scheduler.budget_left == 0
+    assert [error for _, error in results].count(BUDGET_EXHAUSTED) == 2
+    assert late == (None, BUDGET_EXHAUSTED)
+
+
+def test_zero_page_budget_is_unlimited():
+    async def run():
+        fetched = []
+        scheduler = PageScheduler(concurrency=2, page_budget=0)
+        results = await fetch_all(scheduler, {"love": 4, "life": 4}, fetched)
+        return scheduler, fetched, results
+
+    scheduler, fetched, results = asyncio.run(run())
+    assert len(fetched) == 8
+    assert scheduler.budget_left is None
+    assert all(error is None for _, error in results)
+
+
+def test_batch_endpoint_passes_the_page_budget(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "http://localhost:54321")
+    monkeypatch.setenv("SUPABASE_KEY", "test")
+    main = importlib.import_module("main")
+
+    schedulers = []
+
+    async def fake_batch(topics, scheduler):
+        schedulers.append(scheduler)
+        yield {"done": True, "topics": topics}
+
+    monkeypatch.setattr(main, "batch_stream", fake_batch)
+    client = TestClient(main.app)
+    for budget in (0, 5, None):
+        response = client.post("/api/scrape/batch", json={"topics": ["Love", "love", "Life"], "page_budget": budget})
+        assert response.status_code == 200
+
+    unlimited, limited, default = schedulers
+    assert unlimited.page_budget == 0 and unlimited.budget_left is None
+    assert limited.budget_left == 5
+    assert default.page_budget == PageScheduler().page_budget
+    assert client.post("/api/scrape/batch", json={"topics": ["love"], "page_budget": -1}).status_code == 422
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from functools import partial
+
+from services import scrape_stream
+from services.image_pipeline import ImagePipeline
+from services.quote_writer import QuoteBatchWriter
+
+
+def fake_scraper(quotes: int):
+    async def scrape(topic, scheduler=None, known=None):
+        yield {"total": quotes, "page": 1}
+        for n in range(quotes):
+            yield {
+                "text": f"Quote {n}", "author": "Author", "link": f"https://example.com/q{n}",
+                "image_url": f"https://example.com/img{n}.jpg", "page": 1, "progress": n + 1, "total": quotes,
+            }
+        yield {"done": True, "total_pages": 1}
+
+    return scrape
+
+
+async def slow_download(url: str):
+    await asyncio.sleep(0.05)
+    return b"image", "image/jpeg"
+
+
+def slow_upload(content: bytes, filename: str, content_type: str):
+    time.sleep(0.05)
+    return f"https://storage.example.com/{filename}"
+
+
+def test_streamed_quotes_are_saved_when_the_client_leaves(monkeypatch):
+    monkeypatch.setattr(scrape_stream, "scrape_brainyquote_generator", fake_scraper(20))
+    monkeypatch.setattr(scrape_stream, "ImagePipeline", partial(ImagePipeline, download=slow_download, download_workers=1))
+
+    async def run():
+        rows = []
+        writer = QuoteBatchWriter(rows.extend, batch_size=1000, flush_interval=60)
+        events = scrape_stream.enriched_events("Self Love", upload=slow_upload, writer=writer)
+        streamed = []
+        async for event in events:
+            if "text" in event:
+                streamed.append(event["link"])
+            if len(streamed) == 10:
+                break
+        # Client gone: the producer is cancelled with quotes still in the pipeline
+        await events.aclose()
+        await writer.flush()
+        return streamed, rows
+
+    streamed, rows = asyncio.run(run())
+    saved = {row["link"] for row in rows}
+    assert set(streamed) <= saved
+    assert {row["topic"] for row in rows} == {"self-love"}
@@ -0,0 +1,75 @@
+import asyncio
+
+from scraper.brainyquote_scraper import scrape_brainyquote_generator
+from scraper.engine import EngineFallback, PageResult, ScrapeEngine
+from scraper.rate_limit import HostLimiter
+
+
+class FakeEngine(ScrapeEngine):
+    """Three pages of two quotes; `failures` maps a page number to the errors its next fetches raise."""
+
+    def __init__(self, name: str, failures: dict[int, list[EngineFallback]] | None = None):
+        self.name = name
+        self.failures = failures or {}
+        self.fetches: list[int] = []
+
+    async def fetch_page(self, url: str, page_number: int) -> PageResult:
+        self.fetches.append(page_number)
+        errors = self.failures.get(page_number)
+        if errors:
+            raise errors.pop(0)
+        records = [
+            {"text": f"Quote {page_number}.{n}", "author": "Author", "href": f"/quotes/q{page_number}_{n}", "src": None, "data_src": None}
+            for n in range(2)
+        ]
+        return PageResult(records=records, last_page=3)
+
+
+def scrape(*engines: ScrapeEngine) -> list[dict]:
+    async def run():
+        limiter = HostLimiter(concurrency=4, rate=0, burst=1)
+        return [event async for event in scrape_brainyquote_generator("love", engines=list(engines), limiter=limiter)]
+
+    return asyncio.run(run())
+
+
+def test_throttled_page_is_retried_after_the_pause():
+    http = FakeEngine("http", {2: [EngineFallback("HTTP 429", retry_after=0.05)]})
+    browser = FakeEngine("playwright")
+    events = scrape(http, browser)
+    assert events[-1] == {"done": True, "total_pages": 3}
+    assert len([event for event in events if event.get("text")]) == 6
+    assert http.fetches.count(2) == 2
+    assert browser.fetches == []
+
+
+def test_transient_failure_does_not_switch_engines_for_good():
+    http = FakeEngine("http", {2: [EngineFallback("timeout", transient=True)] * 3})
+    browser = FakeEngine("playwright")
+    events = scrape(http, browser)
+    assert events[-1]["done"]
+    assert browser.fetches == [2]
+    assert 3 in http.fetches
+
+
+def test_page_that_keeps_failing_ends_with_an_error():
+    http = FakeEngine("http", {2: [EngineFallback("timeout", transient=True)] * 3})
+    events = scrape(http)
+    assert "done" not in events[-1]
+    assert "page 2" in events[-1]["error"]
+
+
+def test_trailing_empty_page_ends_the_topic_normally():
+    empty = lambda: [EngineFallback("No quotes in the server-rendered HTML", empty=True)]
+    http = FakeEngine("http", {3: empty()})
+    browser = FakeEngine("playwright", {3: empty()})
+    events = scrape(http, browser)
+    assert events[-1] == {"done": True, "total_pages": 2}
+    assert len([event for event in events if event.get("text")]) == 4
+    assert http.fetches.count(3) == 1
+
+
+def test_empty_first_page_is_an_error():
+    http = FakeEngine("http", {1: [EngineFallback("No quotes in the server-rendered HTML", empty=True)]})
+    events = scrape(http)
+    assert events == [{"error": "No quotes in the server-rendered HTML"}]
@@ -0,0 +1,50 @@
+import asyncio
+
+from services.seen_index import SeenIndex
+
+
+def row(n: int, topic: str = "love") -> dict:
+    return {"text": f"Quote {n}", "author": "Author", "link": f"https://example.com/q{n}", "topic": topic}
+
+
+def test_load_returns_a_snapshot(tmp_path):
+    async def run():
+        index = SeenIndex(loader=lambda topic: [row(1)], directory=str(tmp_path))
+        known = await index.load("love")
+        await index.record([row(2)])
+        assert known == {"https://example.com/q1"}
+        assert await index.load("Love") == {"https://example.com/q1", "https://example.com/q2"}
+
+    asyncio.run(run())
+
+
+def test_snapshots_merge_keys_recorded_by_other_processes(tmp_path):
+    async def run():
+        first = SeenIndex(directory=str(tmp_path))
+        second = SeenIndex(directory=str(tmp_path))
+        await first.load("love")
+        await second.load("love")
+        await first.record([row(1)])
+        await second.record([row(2)])
+
+        fresh = SeenIndex(directory=str(tmp_path))
+        assert await fresh.load("love") == {"https://example.com/q1", "https://example.com/q2"}
+        assert await second.load("love") == {"https://example.com/q1", "https://example.com/q2"}
+        assert not list(tmp_path.glob("*.tmp"))
+
+    asyncio.run(run())
+
+
+def test_rows_saved_while_a_topic_is_evicted_reach_its_snapshot(tmp_path):
+    async def run():
+        stored = [row(1)]
+        index = SeenIndex(loader=lambda topic: list(stored), directory=str(tmp_path), max_topics=1)
+        await index.load("love")
+        await index.record([row(2)])  # writes the snapshot of "love"
+        await index.load("life")  # evicts "love"
+
+        stored.append(row(3))
+        await index.record([row(3)])
+        assert await index.load("love") == {f"https://example.com/q{n}" for n in (1, 2, 3)}
+
+    asyncio.run(run())
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+import zlib
+from pathlib import Path
+
+import pytest
+
+from services import stream_format
+from services.stream_format import CompactEncoder, encode_stream, negotiate_encoding
+
+# Also read by the frontend's CompactEvents test: both sides of the compact format
+FIXTURE = json.loads((Path(__file__).parent / "fixtures" / "compact_stream.json").read_text(encoding="utf-8"))
+
+
+async def source(events, delay: float = 0.0, error: Exception | None = None):
+    for event in events:
+        if delay:
+            await asyncio.sleep(delay)
+        yield event
+    if error is not None:
+        raise error
+
+
+def collect(events, format: str = "ndjson", encoding: str | None = None, **options) -> list[bytes]:
+    async def run():
+        return [chunk async for chunk in encode_stream(events, format, encoding, FIXTURE["topic"], **options)]
+
+    return asyncio.run(run())
+
+
+def decompress(chunks: list[bytes], encoding: str | None) -> bytes:
+    data = b"".join(chunks)
+    if encoding == "gzip":
+        return zlib.decompress(data, 31)
+    if encoding == "zstd":
+        return stream_format.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def lines(data: bytes) -> list[dict]:
+    return [json.loads(line) for line in data.splitlines()]
+
+
+ENCODINGS = [None, "gzip"] + (["zstd"] if stream_format.zstandard is not None else [])
+
+
+def test_compact_encoder_matches_the_fixture():
+    encoder = CompactEncoder(FIXTURE["topic"], base=FIXTURE["base"])
+    assert [encoder.header()] + [encoder.encode(event) for event in FIXTURE["events"]] == FIXTURE["compact"]
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_ndjson_round_trip(encoding):
+    chunks = collect(source(FIXTURE["events"]), "ndjson", encoding)
+    assert lines(decompress(chunks, encoding)) == FIXTURE["events"]
+
+
+@pytest.mark.parametrize("encoding", ENCODINGS)
+def test_compact_round_trip(encoding):
+    chunks = collect(source(FIXTURE["events"]), "compact", encoding)
+    assert lines(decompress(chunks, encoding)) == FIXTURE["compact"]
+
+
+@pytest.mark.skipif(stream_format.msgpack is None, reason="msgpack not installed")
+def test_msgpack_round_trip():
+    unpacker = stream_format.msgpack.Unpacker()
+    unpacker.feed(decompress(collect(source(FIXTURE["events"]), "msgpack", "gzip"), "gzip"))
+    assert list(unpacker) == FIXTURE["compact"]
+
+
+def test_compressed_stream_flushes_buffered_events_when_the_source_is_idle():
+    produced = []
+
+    async def stamped(events):
+        async for event in source(events, delay=0.2):
+            produced.append(time.monotonic())
+            yield event
+
+    async def run():
+        return [
+            (time.monotonic(), chunk)
+            async for chunk in encode_stream(stamped(FIXTURE["events"][:3]), "ndjson", "gzip", flush_interval=0.05)
+        ]
+
+    received = asyncio.run(run())
+    decompressor = zlib.decompressobj(31)
+    arrivals = []
+    for at, chunk in received:
+        arrivals += [at] * len(decompressor.decompress(chunk).splitlines())
+    assert len(arrivals) == len(produced) == 3
+    # Every event reaches the client before the next one is produced (not all at the end)
+    for n, at in enumerate(arrivals):
+        assert at >= produced[n]
+        if n + 1 < len(produced):
+            assert at < produced[n + 1]
+
+
+def test_source_errors_propagate():
+    with pytest.raises(RuntimeError, match="boom"):
+        collect(source(FIXTURE["events"][:2], error=RuntimeError("boom")), "ndjson", "gzip")
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding(None) is None
@@ -0,0 +1,61 @@
+import pytest
+
+from scraper.timeouts import AdaptiveTimeout
+
+
+def test_ceiling_until_warmed_up():
+    timeout = AdaptiveTimeout(ceiling=30, floor=1, warmup=3)
+    timeout.observe(2)
+    timeout.observe(2)
+    assert timeout.seconds == 30
+    timeout.observe(2)
+    assert timeout.seconds < 30
+
+
+def test_follows_measured_durations_within_bounds():
+    timeout = AdaptiveTimeout(ceiling=30, floor=1, warmup=1)
+    for _ in range(50):
+        timeout.observe(2)
+    assert timeout.seconds == pytest.approx(2, abs=0.01)
+    assert timeout.ms == pytest.approx(2000, abs=10)
+
+    fast = AdaptiveTimeout(ceiling=30, floor=1, warmup=1)
+    for _ in range(50):
+        fast.observe(0.01)
+    assert fast.seconds == 1
+
+
+def test_expiry_doubles_the_timeout_until_a_success():
+    timeout = AdaptiveTimeout(ceiling=30, floor=1, warmup=1)
+    for _ in range(50):
+        timeout.observe(2)
+    base = timeout.seconds
+    timeout.expired()
+    assert timeout.seconds == pytest.approx(2 * base)
+    timeout.expired()
+    assert timeout.seconds == pytest.approx(4 * base)
+    for _ in range(5):
+        timeout.expired()
+    assert timeout.seconds == 30
+    assert not timeout.cut_short
+
+    timeout.observe(2)
+    assert timeout.seconds == pytest.approx(base, rel=0.05)
+    assert timeout.cut_short
+    assert timeout.metrics()["expired"] == 7
+
+
+def test_measure_records_successes_and_expiries():
+    timeout = AdaptiveTimeout(ceiling=30, floor=1, warmup=1)
+    with timeout.measure((TimeoutError,)):
+        pass
+    assert timeout.metrics()["samples"] == 1
+
+    with pytest.raises(TimeoutError):
+        with timeout.measure((TimeoutError,)):
+            raise TimeoutError
+    with pytest.raises(ValueError):
+        with timeout.measure((TimeoutError,)):
+            raise ValueError
+    assert timeout.metrics()["expired"] == 1
+    assert timeout.metrics()["samples"] == 1
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import time
+
+from services.topic_cache import TopicCache
+
+
+class FakeProducer:
+    """Scrape stand-in: counts its runs and holds its events until `release` is set."""
+
+    def __init__(self, label: str = "fresh"):
+        self.label = label
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, topic: str):
+        self.calls += 1
+        yield {"total": 1, "page": 1}
+        await self.release.wait()
+        yield {"text": f"{self.label} quote", "topic": topic}
+        yield {"done": True, "total_pages": 1}
+
+
+async def collect(events) -> list[dict]:
+    return [event async for event in events]
+
+
+def test_concurrent_requests_share_one_scrape(tmp_path):
+    async def run():
+        producer = FakeProducer()
+        cache = TopicCache(producer, directory=str(tmp_path), ttl=60, stale_ttl=60)
+        clients = [asyncio.create_task(collect(cache.stream("Self Love"))) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        producer.release.set()
+        results = await asyncio.gather(*clients)
+
+        assert producer.calls == 1
+        assert all(events == results[0] for events in results)
+        assert results[0][-1] == {"done": True, "total_pages": 1}
+        metrics = cache.metrics()
+        assert (metrics["misses"], metrics["shared"]) == (1, 4)
+
+        # Completed: the next request is a hit
+        assert await collect(cache.stream("self-love")) == results[0]
+        assert producer.calls == 1
+
+    asyncio.run(run())
+
+
+def test_stale_entry_is_served_while_one_refresh_runs(tmp_path):
+    async def run():
+        producer = FakeProducer()
+        cache = TopicCache(producer, directory=str(tmp_path), ttl=60, stale_ttl=600)
+        cached = [{"text": "cached quote", "topic": "love"}, {"done": True, "total_pages": 1}]
+        with open(cache._path("love"), "w", encoding="utf-8") as f:
+            json.dump({"created": time.time() - 120, "events": cached}, f)
+
+        # Served at once, although the refresh is still waiting for its events
+        results = await asyncio.gather(*(collect(cache.stream("love")) for _ in range(3)))
+        assert results == [cached] * 3
+        assert producer.calls == 1
+        assert cache.metrics()["stale_hits"] == 3
+        assert cache.metrics()["running_scrapes"] == 1
+
+        producer.release.set()
+        while cache.metrics()["running_scrapes"]:
+            await asyncio.sleep(0.01)
+        refreshed = await collect(cache.stream("love"))
+        assert refreshed[1]["text"] == "fresh quote"
+        assert producer.calls == 1
+        assert cache.metrics()["hits"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,209 @@
+export interface Quote {
+  text: string
+  author: string
+  link: string
+  image_url?: string | null
+  topic?: string
+  page?: number
+  progress?: number
+  total?: number
+}
+
+interface ScraperOptions {
+  // Replaceable for the render benchmark (synthetic streams)
+  fetcher?: (url: string, init: RequestInit) => Promise<Response>
+}
+
+// Streams /api/scrape into a quote list. Incoming events are buffered and
+// applied once per animation frame, so a fast stream costs one render per
+// frame instead of one per quote. The list is a shallowRef of plain objects
+// (no deep proxies), given a new array once per frame when it changed.
+export const useScraper = (options: ScraperOptions = {}) => {
+  const quotes = shallowRef<Quote[]>([])
+  const loading = ref(false)
+  const error = ref("")
+  const progress = ref(0)
+  const total = ref(0)
+  const displayedPercentage = ref(0)
+
+  let abortController: AbortController | null = null
+  // Index of each quote by link, to apply the stored image URL sent after it
+  const indexByLink = new Map<string, number>()
+
+  let pending: Record<string, any>[] = []
+  let frame: number | null = null
+
+  const scheduleFlush = () => {
+    if (frame === null) frame = requestAnimationFrame(flush)
+  }
+
+  const cancelFlush = () => {
+    if (frame !== null) cancelAnimationFrame(frame)
+    frame = null
+  }
+
+  // Moves the progress bar forward for one more quote
+  const advance = (count: number, horizon: number, percent: number) => {
+    // Dynamic Horizon: If we are getting close to the estimated total, extend it.
+    if (count >= horizon * 0.8) horizon += 30
+
+    // --- Monotonic Asymptotic Logic ---
+    const rawPercent = (count / horizon) * 100
+    let nextPercent = percent
+    if (rawPercent > percent) {
+      // If we are nearing 100%, dampen the approach (Asymptotic)
+      nextPercent = rawPercent > 95 ? percent + (rawPercent - percent) * 0.1 : rawPercent
+    } else {
+      // Horizon expanded (rawPercent dropped), but we MUST NOT go back.
+      // Artificial micro-increment to show "aliveness"
+      nextPercent += 0.1
+    }
+    // Hard cap at 99.5% until fully done
+    return { horizon, percent: Math.min(nextPercent, 99.5) }
+  }
+
+  const finish = () => {
+    loading.value = false
+    total.value = progress.value // Snap to final count
+    displayedPercentage.value = 100
+  }
+
+  // Applies every event received since the last frame
+  const flush = () => {
+    frame = null
+    if (!pending.length) return
+    const events = pending
+    pending = []
+
+    const list = quotes.value.slice()
+    let horizon = total.value
+    let percent = displayedPercentage.value
+    let changed = false
+    let final: Record<string, any> | null = null
+
+    for (const data of events) {
+      if (data.error) {
+        final = data
+        break
+      }
+      // Stored image URL, known once the backend has uploaded the image
+      if (data.image_ready) {
+        const index = indexByLink.get(data.image_ready)
+        if (index !== undefined) {
+          list[index] = { ...list[index]!, image_url: data.image_url }
+          changed = true
+        }
+        continue
+      }
+      if (data.done) {
+        final = data
+        break
+      }
+      if (data.text) {
+        indexByLink.set(data.link, list.length)
+        list.push(data as Quote)
+        changed = true
+        ;({ horizon, percent } = advance(list.length, horizon, percent))
+      }
+    }
+
+    if (changed) quotes.value = list
+    progress.value = list.length
+    total.value = horizon
+    displayedPercentage.value = percent
+
+    if (final) {
+      // Nothing more to read: stop the stream (events after the final one are dropped)
+      const controller = abortController
+      abortController = null
+      pending = []
+      controller?.abort()
+      if (final.error) {
+        error.value = final.error
+        loading.value = false
+      } else {
+        finish()
+      }
+    }
+  }
+
+  const start = async (topic: string) => {
+    cancelFlush()
+    abortController?.abort()
+
+    // Reset state
+    error.value = ""
+    loading.value = true
+    quotes.value = []
+    indexByLink.clear()
+    pending = []
+    progress.value = 0
+    displayedPercentage.value = 0
+    total.value = 30 // Start with an estimated "horizon" of one page
+
+    // Create new controller for this request
+    const controller = new AbortController()
+    abortController = controller
+
+    const apiBase = useRuntimeConfig().public.apiBase
+    const fetcher = options.fetcher ?? fetch
+
+    try {
+      // Compact events (no repeated URL prefixes or progress totals); the
+      // browser also negotiates gzip/zstd and decompresses transparently
+      const response = await fetcher(`${apiBase}/api/scrape?topic=${encodeURIComponent(topic)}&format=compact`, {
+        signal: controller.signal,
+      })
+      if (!response.ok) {
+        throw new Error(`Erreur HTTP: ${response.status}`)
+      }
+      if (!response.body) {
+        throw new Error("Pas de réponse du serveur")
+      }
+
+      const reader = response.body.getReader()
+      const decoder = new NdjsonDecoder()
+      const compact = new CompactEvents()
+      while (true) {
+        const { done, value } = await reader.read()
+        const lines = (done ? decoder.flush() : decoder.push(value)) as Record<string, any>[]
+        for (const line of lines) {
+          const event = compact.expand(line)
+          if (event) pending.push(event)
+        }
+        if (pending.length) scheduleFlush()
+        if (done) break
+      }
+    } catch (e: any) {
+      if (e.name === "AbortError") {
+        // Stopped by the user (a final done/error event also aborts, after clearing abortController)
+        if (abortController === controller) console.log("Scraping annulé")
+      } else {
+        console.error(e)
+        error.value = e.message || "Impossible de récupérer les données"
+      }
+    } finally {
+      if (abortController === controller) {
+        // Stream over: apply what is left now rather than on the next frame
+        cancelFlush()
+        flush()
+        loading.value = false
+        abortController = null
+      }
+    }
+  }
+
+  const stop = () => {
+    if (abortController) {
+      abortController.abort()
+      loading.value = false
+    }
+  }
+
+  onBeforeUnmount(() => {
+    cancelFlush()
+    abortController?.abort()
+  })
+
+  return { quotes, loading, error, progress, total, displayedPercentage, start, stop }
+}
@@ -0,0 +1,96 @@
+// Incremental NDJSON decoder: each chunk is scanned once, from its own start,
+// instead of re-splitting an ever-growing buffer on every read.
+export class NdjsonDecoder {
+  private decoder = new TextDecoder()
+  // Pieces of the current, still incomplete line (joined once its "\n" arrives)
+  private pending: string[] = []
+
+  push(chunk: Uint8Array): unknown[] {
+    return this.lines(this.decoder.decode(chunk, { stream: true }))
+  }
+
+  // End of stream: the last line may lack its "\n"
+  flush(): unknown[] {
+    const events = this.lines(this.decoder.decode())
+    if (this.pending.length) {
+      this.parse(this.pending.join(""), events)
+      this.pending = []
+    }
+    return events
+  }
+
+  private lines(text: string): unknown[] {
+    const events: unknown[] = []
+    let start = 0
+    let newline = text.indexOf("\n")
+    while (newline !== -1) {
+      let line = text.slice(start, newline)
+      if (this.pending.length) {
+        this.pending.push(line)
+        line = this.pending.join("")
+        this.pending = []
+      }
+      this.parse(line, events)
+      start = newline + 1
+      newline = text.indexOf("\n", start)
+    }
+    if (start < text.length) this.pending.push(text.slice(start))
+    return events
+  }
+
+  private parse(line: string, events: unknown[]) {
+    if (!line.trim()) return
+    try {
+      events.push(JSON.parse(line))
+    } catch (parseError) {
+      console.warn("Erreur de parsing JSON:", parseError, line)
+    }
+  }
+}
+
+// Expands the "compact" stream format of /api/scrape (see CompactEncoder in
+// the backend) back into the regular events.
+export class CompactEvents {
+  private base = ""
+  private topic: string | undefined
+  private page = 0
+  private total = 0
+  private progress = 0
+
+  private url(value: string | null | undefined) {
+    return value && value.startsWith("/") ? this.base + value : value ?? null
+  }
+
+  expand(event: Record<string, any>): Record<string, any> | null {
+    if (event.v !== undefined) {
+      this.base = event.base
+      this.topic = event.topic ?? undefined
+      return null
+    }
+    if (event.q !== undefined) {
+      this.progress += 1
+      return {
+        text: event.q,
+        author: event.a,
+        link: this.url(event.l),
+        image_url: this.url(event.i),
+        topic: event.t ?? this.topic,
+        page: this.page,
+        progress: this.progress,
+        total: this.total,
+      }
+    }
+    if (event.r !== undefined) return { image_ready: this.url(event.r), image_url: this.url(event.i) }
+    if (event.pg !== undefined) {
+      this.page = event.pg
+      this.total = event.n
+      this.progress = 0
+      return { total: event.n, page: event.pg }
+    }
+    if (event.s !== undefined) {
+      this.progress += 1
+      return { progress: this.progress, total: this.total }
+    }
+    return event
+  }
+}
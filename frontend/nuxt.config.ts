@@ -5,6 +5,17 @@ export default defineNuxtConfig({
   compatibilityDate: '2025-07-15',
   devtools: { enabled: true },
   css: ['./app/assets/css/main.css'],
+  modules: [
+    // The render benchmark (/bench) is a dev tool: left out of production
+    // builds unless NUXT_ENABLE_BENCH is set
+    (_options, nuxt) => {
+      if (nuxt.options.dev || (process.env as any).NUXT_ENABLE_BENCH) return
+      nuxt.hook('pages:extend', (pages) => {
+        const index = pages.findIndex((page) => page.path === '/bench')
+        if (index !== -1) pages.splice(index, 1)
+      })
+    },
+  ],
   vite: {
     plugins: [
       tailwindcss(),
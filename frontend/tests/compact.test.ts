@@ -0,0 +1,27 @@
+import assert from "node:assert/strict"
+import { readFileSync } from "node:fs"
+import { test } from "node:test"
+
+import { CompactEvents, NdjsonDecoder } from "../app/utils/ndjson.ts"
+
+// Shared with the backend's CompactEncoder test (backend/tests/test_stream_format.py), which checks
+// the encoder output against it: both sides of the compact format
+const FIXTURE = JSON.parse(
+  readFileSync(new URL("../../backend/tests/fixtures/compact_stream.json", import.meta.url), "utf-8"),
+)
+
+test("expands the compact events of the backend encoder back into the regular events", () => {
+  const compact = new CompactEvents()
+  const events = FIXTURE.compact.map((event: Record<string, any>) => compact.expand(event))
+  assert.equal(events[0], null)
+  assert.deepEqual(events.slice(1), FIXTURE.events)
+})
+
+test("round-trips a compact NDJSON stream through the line decoder", () => {
+  const bytes = new TextEncoder().encode(FIXTURE.compact.map((event: unknown) => JSON.stringify(event) + "\n").join(""))
+  const decoder = new NdjsonDecoder()
+  const compact = new CompactEvents()
+  const lines = [...decoder.push(bytes.subarray(0, 100)), ...decoder.push(bytes.subarray(100)), ...decoder.flush()]
+  const events = lines.map((line) => compact.expand(line as Record<string, any>)).filter((event) => event !== null)
+  assert.deepEqual(events, FIXTURE.events)
+})
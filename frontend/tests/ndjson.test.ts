@@ -0,0 +1,53 @@
+// Run with `npm test` (Node's test runner, TypeScript type stripping: Node >= 22.6)
+import assert from "node:assert/strict"
+import { test } from "node:test"
+
+import { NdjsonDecoder } from "../app/utils/ndjson.ts"
+
+const EVENTS = [
+  { total: 2, page: 1 },
+  { text: "L'amour est patient — toujours.", author: "Zoë", link: "https://www.brainyquote.com/quotes/zoe_1", page: 1, progress: 1, total: 2 },
+  { text: "希望は永遠に 🌱", author: "Ōno", link: "https://www.brainyquote.com/quotes/ono_2", page: 1, progress: 2, total: 2 },
+  { done: true, total_pages: 1 },
+]
+const BYTES = new TextEncoder().encode(EVENTS.map((event) => JSON.stringify(event) + "\n").join(""))
+
+function decode(chunks: Uint8Array[]): unknown[] {
+  const decoder = new NdjsonDecoder()
+  const events = chunks.flatMap((chunk) => decoder.push(chunk))
+  return [...events, ...decoder.flush()]
+}
+
+test("decodes a stream split at any byte, including inside multi-byte characters", () => {
+  for (let split = 0; split <= BYTES.length; split++) {
+    assert.deepEqual(decode([BYTES.subarray(0, split), BYTES.subarray(split)]), EVENTS, `split at byte ${split}`)
+  }
+})
+
+test("decodes a stream read one byte at a time", () => {
+  const chunks = Array.from(BYTES, (byte) => Uint8Array.of(byte))
+  assert.deepEqual(decode(chunks), EVENTS)
+})
+
+test("decodes randomly sized chunks", () => {
+  let seed = 42
+  const random = () => (seed = (seed * 1103515245 + 12345) % 2 ** 31) / 2 ** 31
+  for (let run = 0; run < 200; run++) {
+    const chunks: Uint8Array[] = []
+    for (let start = 0; start < BYTES.length; ) {
+      const end = Math.min(BYTES.length, start + 1 + Math.floor(random() * 40))
+      chunks.push(BYTES.subarray(start, end))
+      start = end
+    }
+    assert.deepEqual(decode(chunks), EVENTS)
+  }
+})
+
+test("flush parses a last line without its newline", () => {
+  const text = JSON.stringify({ done: true }) + "\n" + JSON.stringify({ error: "interrompu" })
+  assert.deepEqual(decode([new TextEncoder().encode(text)]), [{ done: true }, { error: "interrompu" }])
+})
+
+test("skips blank lines", () => {
+  assert.deepEqual(decode([new TextEncoder().encode('\n{"a":1}\n\n  \n{"b":2}\n')]), [{ a: 1 }, { b: 2 }])
+})